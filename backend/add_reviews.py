@@ -104,10 +104,8 @@ def create_sample_reviews():
 
     # Display summary
     print("\n=== Reviews Summary ===")
-    for property in properties:
-        reviews = property.reviews.all()
-        avg_rating = property.average_rating
-        print(f"{property.name}: {reviews.count()} reviews, Avg Rating: {avg_rating:.1f}")
+    for property in Property.objects.only('name', 'review_count', 'average_rating'):
+        print(f"{property.name}: {property.review_count} reviews, Avg Rating: {property.average_rating:.1f}")
 
 if __name__ == "__main__":
     create_sample_reviews()
@@ -0,0 +1,197 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from urllib.parse import urlencode
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+
+class LocalLRU:
+    """A small thread-safe per-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class TieredCache:
+    """
+    A per-process LRU in front of a shared Django cache (Redis in production).
+
+    Keys are scoped by versioned namespaces: invalidating a namespace bumps its
+    version in the shared cache, which orphans every key built with the old
+    version in both tiers. Other processes pick the new version up within
+    ``version_timeout`` seconds. Errors from the shared tier are logged and
+    treated as misses so an unavailable Redis degrades to uncached reads.
+    """
+
+    def __init__(self, alias='default', max_entries=1000, local_timeout=30, version_timeout=2):
+        self.alias = alias
+        self.local = LocalLRU(max_entries)
+        self.local_timeout = local_timeout
+        self.version_timeout = version_timeout
+        self.versions = LocalLRU(max_entries)
+        self.stats = Counter()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def _shared_call(self, method, *args):
+        try:
+            return getattr(self.shared, method)(*args)
+        except Exception as exc:
+            self.stats['shared_errors'] += 1
+            logger.warning('Shared cache %s failed: %s', method, exc)
+            return None
+
+    def namespace_version(self, namespace):
+        version = self.versions.get(namespace)
+        if version is None:
+            version = self._shared_call('get', f'ns:{namespace}') or 1
+            self.versions.set(namespace, version, self.version_timeout)
+        return version
+
+    def make_key(self, namespaces, key):
+        versions = ','.join(f'{namespace}.{self.namespace_version(namespace)}' for namespace in namespaces)
+        return f'{key}@{versions}'
+
+    def get(self, namespaces, key):
+        key = self.make_key(namespaces, key)
+        value = self.local.get(key)
+        if value is not None:
+            self.stats['local_hits'] += 1
+            return value
+        value = self._shared_call('get', key)
+        if value is not None:
+            self.stats['shared_hits'] += 1
+            self.local.set(key, value, self.local_timeout)
+            return value
+        self.stats['misses'] += 1
+        return None
+
+    def set(self, namespaces, key, value, timeout):
+        key = self.make_key(namespaces, key)
+        self.local.set(key, value, min(timeout, self.local_timeout))
+        self._shared_call('set', key, value, timeout)
+        self.stats['sets'] += 1
+
+    def invalidate(self, *namespaces):
+        """Bump the namespaces once the current transaction commits."""
+        transaction.on_commit(lambda: self._bump(namespaces))
+
+    def _bump(self, namespaces):
+        for namespace in namespaces:
+            version = time.time_ns()
+            self._shared_call('set', f'ns:{namespace}', version, None)
+            self.versions.set(namespace, version, self.version_timeout)
+            self.stats['invalidations'] += 1
+
+    def get_stats(self):
+        lookups = self.stats['local_hits'] + self.stats['shared_hits'] + self.stats['misses']
+        hits = lookups - self.stats['misses']
+        return {
+            'pid': os.getpid(),
+            'local_entries': len(self.local.entries),
+            **{name: self.stats[name] for name in
+               ('local_hits', 'shared_hits', 'misses', 'sets', 'invalidations', 'shared_errors')},
+            'hit_rate': round(hits / lookups, 4) if lookups else None,
+        }
+
+
+response_cache = TieredCache()
+
+
+def normalized_params(request, ignored=()):
+    """Sorted query parameters as a stable query string.
+
+    Empty values are kept: views can treat a present-but-empty parameter
+    differently from a missing one (``?cursor=`` selects keyset pagination).
+    """
+    return urlencode(sorted(
+        (key, value)
+        for key, values in request.query_params.lists() if key not in ignored
+        for value in values
+    ))
+
+
+def request_cache_key(prefix, request, ignored=()):
+    # The host is part of the key because serializers build absolute URLs.
+    raw = f'{request.get_host()}{request.path}?{normalized_params(request, ignored)}'
+    return f'{prefix}:{hashlib.sha256(raw.encode()).hexdigest()}'
+
+
+class CachedResponseMixin:
+    """
+    Serves GETs from ``response_cache``, for anonymous users only unless
+    ``should_cache()`` says otherwise. Views set ``cache_prefix`` and
+    ``cache_timeout`` and return their namespaces from
+    ``get_cache_namespaces()``. Responses carry an ``X-Cache`` header.
+    """
+    cache_prefix = None
+    cache_timeout = 60
+    cache_ignored_params = ()
+
+    def get_cache_namespaces(self):
+        raise NotImplementedError
+
+    def should_cache(self, request):
+        return not request.user.is_authenticated
+
+    def get(self, request, *args, **kwargs):
+        if not self.should_cache(request):
+            return super().get(request, *args, **kwargs)
+
+        namespaces = self.get_cache_namespaces()
+        key = request_cache_key(self.cache_prefix, request, self.cache_ignored_params)
+        data = response_cache.get(namespaces, key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.set(namespaces, key, response.data, self.cache_timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class CacheStatsView(APIView):
+    """Hit/miss counters of the response cache in the process serving the request."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache.get_stats())
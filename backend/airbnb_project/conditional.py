@@ -0,0 +1,60 @@
+import hashlib
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource has changed since it was fetched.'
+    default_code = 'precondition_failed'
+
+
+def make_etag(*parts):
+    """A strong ETag from the values that identify a representation."""
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+class ConditionalMixin:
+    """
+    Conditional requests from a cheap version lookup.
+
+    Views return ``(etag, last_modified)`` from ``get_version()``, or None when
+    the resource does not exist. A GET whose ``If-None-Match`` or
+    ``If-Modified-Since`` still matches gets a 304 before anything is
+    serialized; a write whose ``If-Match`` or ``If-Unmodified-Since`` no longer
+    matches is rejected with 412 so concurrent edits are not lost.
+    """
+
+    def get_version(self):
+        raise NotImplementedError
+
+    def evaluate_preconditions(self, request):
+        version = self.get_version()
+        if version is None:
+            return None, None
+        etag, last_modified = version
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return version, get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS:
+            _, response = self.evaluate_preconditions(request)
+            if response is not None:
+                raise PreconditionFailed()
+
+    def get(self, request, *args, **kwargs):
+        version, response = self.evaluate_preconditions(request)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if version is not None and response.status_code in (200, 304):
+            etag, last_modified = version
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
@@ -0,0 +1,136 @@
+import base64
+import datetime
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorEncoder(json.JSONEncoder):
+    """Lossless encoding of ordering values; DjangoJSONEncoder drops microseconds."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.date, datetime.time)):
+            return o.isoformat()
+        return str(o)
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination that switches to keyset pagination when the client
+    sends ``?cursor=`` (empty for the first page). Keyset pages seek past the
+    last row of the previous page on the queryset's ordering columns plus the
+    primary key as a tie-breaker, so they issue no COUNT(*) or OFFSET and a deep
+    page costs the same as the first one.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_keyset = self.cursor_query_param in request.query_params
+        if not self.use_keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        keys = self.get_keys(queryset)
+        if position is not None:
+            position = self.to_python_position(queryset.model, keys, position)
+
+        if reverse:
+            keys_for_query = [(name, not descending) for name, descending in keys]
+        else:
+            keys_for_query = keys
+        queryset = queryset.order_by(*[f'-{name}' if descending else name for name, descending in keys_for_query])
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(keys_for_query, position))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_position = None
+        self.previous_position = None
+        if rows:
+            if has_more or reverse:
+                self.next_position = self.get_position(rows[-1], keys)
+            if (has_more and reverse) or (position is not None and not reverse):
+                self.previous_position = self.get_position(rows[0], keys)
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.use_keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.encode_cursor(self.next_position, reverse=False),
+            'previous': self.encode_cursor(self.previous_position, reverse=True),
+            'results': data,
+        })
+
+    def get_keys(self, queryset):
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        keys = []
+        for name in ordering:
+            if not isinstance(name, str):
+                raise NotFound('Cursor pagination is not available for this ordering')
+            keys.append((name.lstrip('-'), name.startswith('-')))
+
+        pk_name = queryset.model._meta.pk.name
+        if not any(name in ('pk', pk_name) for name, _ in keys):
+            keys.append((pk_name, keys[-1][1] if keys else True))
+        return keys
+
+    @staticmethod
+    def seek_filter(keys, position):
+        # (a, b, pk) after (x, y, z)  ==  a > x OR (a = x AND b > y) OR (a = x AND b = y AND pk > z)
+        condition = Q()
+        for index, (name, descending) in enumerate(keys):
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            equal = {keys[i][0]: position[i] for i in range(index)}
+            condition |= Q(**equal, **{lookup: position[index]})
+        return condition
+
+    @staticmethod
+    def get_position(row, keys):
+        if isinstance(row, dict):
+            return [row[name] for name, _ in keys]
+        return [getattr(row, name) for name, _ in keys]
+
+    def encode_cursor(self, position, reverse):
+        if position is None:
+            return None
+        payload = json.dumps({'p': position, 'r': reverse}, cls=CursorEncoder, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return payload['p'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python_position(self, model, keys, position):
+        if not isinstance(position, list) or len(position) != len(keys):
+            raise NotFound(self.invalid_cursor_message)
+        values = []
+        for (name, _), value in zip(keys, position):
+            try:
+                field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+                value = field.to_python(value)
+            except FieldDoesNotExist:
+                pass
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            values.append(value)
+        return values
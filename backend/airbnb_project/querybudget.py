@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import connection
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(limit, label='Block'):
+    """
+    Fail with QueryBudgetExceeded when the block runs more than ``limit``
+    queries on the default database. Yields the list of executed SQL.
+    """
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        yield queries
+    if len(queries) > limit:
+        raise QueryBudgetExceeded(
+            f'{label} ran {len(queries)} queries, over its budget of {limit}:\n' + '\n'.join(queries)
+        )
+
+
+class QueryBudgetMixin:
+    """
+    Caps the queries one request may run, whatever its page size.
+
+    Views set ``query_budgets`` to ``{method: limit}``; the limit includes
+    authentication. The apps' tests run each budgeted view under
+    ``query_budget()``, so N+1 regressions fail the suite. With
+    ``QUERY_BUDGETS_ENFORCED`` set, any request over budget also raises
+    QueryBudgetExceeded, e.g. on a staging server.
+    """
+    query_budgets = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        limit = self.query_budgets.get(request.method)
+        if limit is None or not settings.QUERY_BUDGETS_ENFORCED:
+            return super().dispatch(request, *args, **kwargs)
+        with query_budget(limit, f'{request.method} {request.path}'):
+            return super().dispatch(request, *args, **kwargs)
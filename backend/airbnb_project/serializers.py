@@ -0,0 +1,315 @@
+import decimal
+from operator import itemgetter
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import empty
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+def _param_names(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {part.strip() for part in value.split(',') if part.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldsets for the top-level serializer of a read.
+
+    ``?fields=a,b`` renders only the named fields. ``?expand=x,y`` renders only
+    the named ``Meta.expandable_fields`` as nested objects and collapses the
+    others to the related object's id. Without the parameters every field is
+    rendered in full, as before.
+
+    Serializers load what they render through ``prepare_queryset()``, so
+    skipped fields cost no joins or prefetches.
+    """
+    fields_param = 'fields'
+    expand_param = 'expand'
+
+    @classmethod
+    def rendered_fields(cls, request):
+        """The field names to render, and the subset rendered as nested objects."""
+        names = list(cls.Meta.fields)
+        expandable = getattr(cls.Meta, 'expandable_fields', {})
+        if request is None or request.method not in SAFE_METHODS:
+            return names, set(expandable).intersection(names)
+
+        requested = _param_names(request, cls.fields_param)
+        if requested is not None:
+            names = [name for name in names if name in requested]
+        expand = _param_names(request, cls.expand_param)
+        expanded = {name for name in names if name in expandable and (expand is None or name in expand)}
+        return names, expanded
+
+    @classmethod
+    def prepare_queryset(cls, queryset, names, expanded):
+        """Add the joins and prefetches the rendered fields need."""
+        return queryset
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_root():
+            return fields
+        names, expanded = self.rendered_fields(self.context.get('request'))
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        return {
+            name: serializers.ReadOnlyField(source=expandable[name])
+            if name in expandable and name not in expanded else fields[name]
+            for name in names
+        }
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+class SparseFieldsViewMixin:
+    """Let the serializer trim the queryset to the fields the request renders."""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, SparseFieldsMixin):
+            names, expanded = serializer_class.rendered_fields(self.request)
+            queryset = serializer_class.prepare_queryset(queryset, set(names), expanded)
+        return queryset
+
+
+class Unsupported(Exception):
+    pass
+
+
+def _decimal_converter(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if field.decimal_places is None or not coerce_to_string or field.localize:
+        return field.to_representation
+    # Same quantize() and format as DecimalField.to_representation.
+    quantum = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+    return lambda value: '{:f}'.format(value.quantize(quantum, rounding=rounding, context=context))
+
+
+def _datetime_converter(field):
+    timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if getattr(field, 'format', api_settings.DATETIME_FORMAT) != ISO_8601 or timezone is None:
+        return field.to_representation
+
+    # Columns come back aware when time zones are enabled.
+    def convert(value):
+        value = value.astimezone(timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _file_converter(field, model_field):
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return None
+    storage = model_field.storage
+    request = field.context.get('request')
+    if request is None:
+        return lambda name: storage.url(name) if name else None
+    return lambda name: request.build_absolute_uri(storage.url(name)) if name else None
+
+
+def _converter(field, model_field):
+    """A function equivalent to ``field.to_representation`` for non-empty column values."""
+    if isinstance(field, serializers.ReadOnlyField):
+        return None
+    if isinstance(field, serializers.FileField):
+        if model_field is None:
+            raise Unsupported(field.field_name)
+        return _file_converter(field, model_field)
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == 'hex_verbose':
+        return str
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, serializers.DateField) and getattr(field, 'format', api_settings.DATE_FORMAT) == ISO_8601:
+        return lambda value: value.isoformat()
+    if isinstance(field, serializers.CharField) and not isinstance(field, serializers.UUIDField):
+        return None if isinstance(model_field, (models.CharField, models.TextField)) else str
+    if isinstance(field, serializers.BooleanField):
+        return field.to_representation if field.allow_null else bool
+    if isinstance(field, serializers.IntegerField):
+        return int
+    if isinstance(field, serializers.FloatField):
+        return float
+    if isinstance(field, (serializers.RelatedField, serializers.ManyRelatedField, serializers.BaseSerializer,
+                          serializers.SerializerMethodField, serializers.HiddenField)):
+        raise Unsupported(field.field_name)
+    return field.to_representation
+
+
+def _resolve(model, source_attrs):
+    """The model field a source path reads, or None when it is not a column."""
+    for index, attr in enumerate(source_attrs):
+        last = index == len(source_attrs) - 1
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.is_relation:
+            return model_field if last else None
+        if last:
+            # Only the id column of a forward relation, e.g. ``host_id``.
+            return model_field if attr == getattr(model_field, 'attname', None) else None
+        if not model_field.concrete or not (model_field.many_to_one or model_field.one_to_one):
+            return None
+        model = model_field.related_model
+    return None
+
+
+class ValuesRepresentation:
+    """
+    Read-only rendering of a serializer from ``values()`` rows.
+
+    Every rendered field is compiled once per request to the columns it reads
+    and a converter with the same output as its ``to_representation()``, so
+    rows skip DRF's per-field attribute lookup and dispatch. Nested serializers
+    read through their relation's columns. Serializers can map fields without
+    a column (method fields, model properties) through ``get_value_fields()``.
+    ``compile()`` returns None when a field has no column equivalent.
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.columns = {}
+
+    @classmethod
+    def compile(cls, serializer, queryset):
+        representation = cls(queryset)
+        try:
+            representation.render_row = representation.compile_serializer(serializer, queryset.model, '')
+        except Unsupported:
+            return None
+        # Keyset pagination reads the ordering columns from the rows.
+        for name in [*queryset.query.order_by, queryset.model._meta.pk.name]:
+            if isinstance(name, str):
+                representation.add_column(name.lstrip('-'))
+        return representation
+
+    def add_column(self, column):
+        if isinstance(column, str):
+            self.columns.setdefault(column, column)
+            return column
+        alias = f'_value{len(self.columns)}'
+        self.columns[alias] = column
+        return alias
+
+    def compile_serializer(self, serializer, model, prefix):
+        if type(serializer).to_representation is not serializers.Serializer.to_representation:
+            raise Unsupported(type(serializer).__name__)
+        custom = serializer.get_value_fields(prefix) if hasattr(serializer, 'get_value_fields') else {}
+        getters = []
+        for field in serializer._readable_fields:
+            name = field.field_name
+            if name in custom:
+                columns, convert = custom[name]
+                keys = [self.add_column(column) for column in columns]
+                getters.append((name, self.custom_getter(keys, convert)))
+                continue
+            getter = self.compile_field(field, model, prefix)
+            if getter is not None:
+                getters.append((name, getter))
+
+        pk_key = self.add_column(prefix + model._meta.pk.name)
+
+        def render(row):
+            if row[pk_key] is None:
+                return None
+            return {name: get(row) for name, get in getters}
+        return render
+
+    def compile_field(self, field, model, prefix):
+        if isinstance(field, serializers.BaseSerializer):
+            related = self.related_model(model, field.source_attrs)
+            if isinstance(field, serializers.ListSerializer) or related is None:
+                raise Unsupported(field.field_name)
+            return self.compile_serializer(field, related, prefix + '__'.join(field.source_attrs) + '__')
+
+        model_field = _resolve(model, field.source_attrs)
+        if model_field is not None:
+            key = self.add_column(prefix + '__'.join(field.source_attrs))
+        elif not prefix and field.source in self.queryset.query.annotations:
+            key = self.add_column(field.source)
+        elif len(field.source_attrs) == 1 and not hasattr(model, field.source):
+            # Serializer.to_representation would get an AttributeError.
+            if field.default is not empty:
+                return lambda row, default=field.get_default(): default
+            if field.allow_null:
+                return lambda row: None
+            if not field.required:
+                return None
+            raise Unsupported(field.field_name)
+        else:
+            raise Unsupported(field.field_name)
+
+        convert = _converter(field, model_field)
+        if convert is None:
+            return itemgetter(key)
+
+        def get(row):
+            value = row[key]
+            return None if value is None else convert(value)
+        return get
+
+    @staticmethod
+    def custom_getter(keys, convert):
+        if len(keys) == 1:
+            key = keys[0]
+            return lambda row: convert(row[key])
+        return lambda row: convert(*[row[key] for key in keys])
+
+    @staticmethod
+    def related_model(model, source_attrs):
+        for attr in source_attrs:
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete or not (model_field.many_to_one or model_field.one_to_one):
+                return None
+            model = model_field.related_model
+        return model
+
+    def values(self):
+        strings = [column for alias, column in self.columns.items() if isinstance(column, str)]
+        expressions = {alias: column for alias, column in self.columns.items() if not isinstance(column, str)}
+        return self.queryset.prefetch_related(None).values(*strings, **expressions)
+
+    def render(self, rows):
+        render_row = self.render_row
+        return [render_row(row) for row in rows]
+
+
+class ValuesListMixin:
+    """
+    Serve list reads from ``values()`` rows through ``ValuesRepresentation``,
+    falling back to the serializer when it cannot be compiled.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        representation = ValuesRepresentation.compile(self.get_serializer(), queryset)
+        if representation is None:
+            page = self.paginate_queryset(queryset)
+            data = self.get_serializer(queryset if page is None else page, many=True).data
+        else:
+            rows = representation.values()
+            page = self.paginate_queryset(rows)
+            data = representation.render(rows if page is None else page)
+
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
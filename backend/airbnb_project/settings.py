@@ -117,6 +117,11 @@ else:
         }
     }
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # SQLite has no row locks: take its write lock when a transaction starts
+    # so check-then-write paths such as booking creation run one at a time.
+    DATABASES['default'].setdefault('OPTIONS', {}).update(transaction_mode='IMMEDIATE', timeout=20)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -151,8 +156,25 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Worker processes rendering PropertyImage renditions
+IMAGE_RENDITION_WORKERS = config('IMAGE_RENDITION_WORKERS', default=2, cast=int)
+
+# Chunked property image uploads (apps.properties.uploads)
+# Chunks are stored in the default storage under this prefix until completion.
+IMAGE_UPLOAD_PART_DIR = config('IMAGE_UPLOAD_PART_DIR', default='uploads/parts')
+IMAGE_UPLOAD_MAX_BYTES = config('IMAGE_UPLOAD_MAX_BYTES', default=25 * 1024 * 1024, cast=int)
+IMAGE_UPLOAD_CHUNK_MAX_BYTES = config('IMAGE_UPLOAD_CHUNK_MAX_BYTES', default=8 * 1024 * 1024, cast=int)
+IMAGE_UPLOAD_PROPERTY_MAX_BYTES = config('IMAGE_UPLOAD_PROPERTY_MAX_BYTES', default=250 * 1024 * 1024, cast=int)
+
+# Pending bookings left unpaid for this long are canceled by expire_pending_bookings.
+PENDING_BOOKING_TTL_MINUTES = config('PENDING_BOOKING_TTL_MINUTES', default=24 * 60, cast=int)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Fail requests that run more queries than their view's query_budgets allow
+# (see airbnb_project/querybudget.py). The tests check the budgets themselves.
+QUERY_BUDGETS_ENFORCED = config('QUERY_BUDGETS_ENFORCED', default=False, cast=bool)
+
 # Custom user model
 AUTH_USER_MODEL = 'users.User'
 
@@ -171,6 +193,17 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
+    # orjson-backed JSON; both fall back to the stdlib when orjson is missing.
+    # Use rest_framework.renderers.JSONRenderer / parsers.JSONParser to opt out.
+    'DEFAULT_RENDERER_CLASSES': (
+        'airbnb_project.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'airbnb_project.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 # Swagger settings
@@ -267,6 +300,18 @@ if not DEBUG:
 # Use Redis URL from environment (for Render) or default to localhost
 REDIS_URL = config('REDIS_URL', default='redis://127.0.0.1:6379')
 
+# Shared tier of airbnb_project.cache.TieredCache. Only an explicitly set
+# REDIS_URL switches the caches to Redis; otherwise Django's per-process
+# locmem cache stays the default, which allauth's rate limiting also uses.
+if config('REDIS_URL', default='').startswith(('redis://', 'rediss://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'airbnb',
+        },
+    }
+
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
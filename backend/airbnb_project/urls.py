@@ -6,6 +6,7 @@ from django.http import JsonResponse
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from .cache import CacheStatsView
 
 def api_root(request):
     """API root endpoint with links to documentation and main endpoints"""
@@ -80,6 +81,7 @@ urlpatterns = [
     path('api/payments/', include('apps.payments.urls')),
     path('api/reviews/', include('apps.reviews.urls')),
     path('api/messages/', include('apps.messages.urls')),
+    path('api/cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
 
     # API Documentation
     path('swagger<str:format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
@@ -0,0 +1,52 @@
+import datetime
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from apps.payments.models import Payment
+from apps.properties.caching import invalidate_calendar
+from .models import Booking, PropertyDailyStats
+
+EXPIRY_CHUNK_SIZE = 1000
+
+
+def pending_ttl():
+    return datetime.timedelta(minutes=settings.PENDING_BOOKING_TTL_MINUTES)
+
+
+def expire_pending_bookings(now=None, chunk_size=EXPIRY_CHUNK_SIZE):
+    """
+    Cancel pending bookings created more than the pending TTL ago, oldest
+    first, one chunk per transaction so the dates they held are released
+    without long locks. Returns the number of bookings canceled.
+    """
+    now = now or timezone.now()
+    cutoff = now - pending_ttl()
+    expired = 0
+    while True:
+        with transaction.atomic():
+            # Rows a payment is confirming right now are left for the next sweep.
+            rows = list(
+                Booking.objects.filter(status='pending', created_at__lt=cutoff)
+                .select_for_update(skip_locked=True).order_by('created_at')
+                .values_list('booking_id', 'booking_property_id', 'start_date')[:chunk_size]
+            )
+            if not rows:
+                break
+            Booking.objects.filter(pk__in=[booking_id for booking_id, _, _ in rows]).update(
+                status='canceled', updated_at=now,
+            )
+            # Same bookkeeping as Booking.save() for a pending booking being canceled.
+            for (property_id, start_date), count in Counter((row[1], row[2]) for row in rows).items():
+                PropertyDailyStats.add_cancellations(property_id, start_date, count)
+            paid = Payment.objects.filter(booking_id__in=[row[0] for row in rows], is_successful=True)
+            for property_id, payment_date, amount in paid.values_list(
+                'booking__booking_property_id', 'payment_date', 'amount'
+            ):
+                PropertyDailyStats.apply_payment(property_id, timezone.localdate(payment_date), -amount)
+            for property_id in {row[1] for row in rows}:
+                invalidate_calendar(property_id)
+        expired += len(rows)
+        if len(rows) < chunk_size:
+            break
+    return expired
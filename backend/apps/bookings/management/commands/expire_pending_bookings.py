@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.bookings.expiry import EXPIRY_CHUNK_SIZE, expire_pending_bookings, pending_ttl
+
+
+class Command(BaseCommand):
+    help = (
+        'Cancels pending bookings older than PENDING_BOOKING_TTL_MINUTES so their dates '
+        'become available again; with --interval it keeps sweeping as a worker'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=EXPIRY_CHUNK_SIZE,
+                            help='Bookings canceled per transaction')
+        parser.add_argument('--interval', type=int,
+                            help='Sweep again every this many seconds instead of exiting')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        if options['interval'] is not None and options['interval'] < 1:
+            raise CommandError('--interval must be positive')
+        while True:
+            started = time.monotonic()
+            expired = expire_pending_bookings(chunk_size=options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Canceled {expired} pending bookings older than {pending_ttl()} '
+                f'in {time.monotonic() - started:.1f}s'
+            ))
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_keyset_indexes'),
+        ('properties', '0007_coordinates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', ('pending', 'confirmed'))), fields=['booking_property', 'start_date', 'end_date'], name='bookings_active_dates_idx'),
+        ),
+    ]
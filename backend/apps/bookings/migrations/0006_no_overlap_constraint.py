@@ -0,0 +1,48 @@
+from django.db import migrations
+
+
+def create_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT count(*) FROM bookings a JOIN bookings b
+              ON a.property_id = b.property_id AND a.booking_id < b.booking_id
+             AND a.start_date <= b.end_date AND a.end_date >= b.start_date
+             WHERE a.status IN ('pending', 'confirmed') AND b.status IN ('pending', 'confirmed')
+        """)
+        overlaps = cursor.fetchone()[0]
+    if overlaps:
+        raise RuntimeError(
+            f'{overlaps} pairs of active bookings overlap; cancel the duplicates before '
+            'adding the bookings_no_overlap constraint'
+        )
+    # btree_gist provides the GiST equality operator for the uuid column.
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    # Both ends are inclusive, matching BookingQuerySet.overlapping().
+    schema_editor.execute(
+        "ALTER TABLE bookings ADD COLUMN stay daterange "
+        "GENERATED ALWAYS AS (daterange(start_date, end_date, '[]')) STORED"
+    )
+    schema_editor.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT bookings_no_overlap "
+        "EXCLUDE USING gist (property_id WITH =, stay WITH &&) "
+        "WHERE (status IN ('pending', 'confirmed'))"
+    )
+
+
+def drop_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE bookings DROP CONSTRAINT IF EXISTS bookings_no_overlap')
+        schema_editor.execute('ALTER TABLE bookings DROP COLUMN IF EXISTS stay')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_active_dates_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_overlap_constraint, drop_overlap_constraint),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_no_overlap_constraint'),
+        ('properties', '0012_blocked_date_ranges'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('booked_nights', models.IntegerField(default=0)),
+                ('arrivals', models.IntegerField(default=0)),
+                ('lead_time_days', models.IntegerField(default=0)),
+                ('cancellations', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='properties.property')),
+            ],
+            options={
+                'db_table': 'property_daily_stats',
+                'constraints': [models.UniqueConstraint(fields=('property', 'date'), name='property_daily_stats_uniq')],
+            },
+        ),
+    ]
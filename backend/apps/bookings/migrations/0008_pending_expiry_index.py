@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_daily_stats'),
+        ('properties', '0012_blocked_date_ranges'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='bookings_pending_created_idx'),
+        ),
+    ]
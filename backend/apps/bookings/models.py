@@ -1,8 +1,50 @@
+import datetime
 import uuid
-from django.db import models
+from django.apps import apps
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Case, F, When
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from apps.users.models import User
-from apps.properties.models import Property
+from apps.properties.caching import invalidate_calendar
+from apps.properties.models import BlockedDateRange, Property
+from apps.properties.ranking import BOOKING_WINDOW, booking_weight
+
+# Statuses of bookings that hold their dates.
+ACTIVE_STATUSES = ('pending', 'confirmed')
+# On PostgreSQL this exclusion constraint on the stored daterange rejects
+# overlapping active bookings (migration 0006_no_overlap_constraint). Other
+# backends lock the property row around the overlap query instead.
+OVERLAP_CONSTRAINT = 'bookings_no_overlap'
+UNAVAILABLE_MESSAGE = 'Property is not available for selected dates'
+# The columns a booking's contribution to PropertyDailyStats depends on.
+STATS_FIELDS = ('booking_property_id', 'start_date', 'end_date', 'status', 'created_at')
+
+
+def overlap_enforced_by_database():
+    return connection.vendor == 'postgresql'
+
+
+class BookingQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(status__in=ACTIVE_STATUSES)
+
+    def overlapping(self, start_date, end_date):
+        return self.filter(start_date__lte=end_date, end_date__gte=start_date)
+
+    def reserve(self, booking_property, user, start_date, end_date, guests):
+        """Create a pending booking, raising ValidationError if the dates are taken."""
+        booking = self.model(
+            booking_property=booking_property,
+            user=user,
+            start_date=start_date,
+            end_date=end_date,
+            guests=guests,
+            total_price=booking_property.pricepernight * (end_date - start_date).days,
+            status='pending',
+        )
+        booking.save()
+        return booking
 
 
 class Booking(models.Model):
@@ -23,12 +65,27 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         db_table = 'bookings'
         indexes = [
             models.Index(fields=['booking_property']),
             models.Index(fields=['user']),
             models.Index(fields=['start_date', 'end_date']),
+            models.Index(fields=['user', 'created_at', 'booking_id']),
+            # Availability checks only ever look at active bookings.
+            models.Index(
+                fields=['booking_property', 'start_date', 'end_date'],
+                condition=models.Q(status__in=ACTIVE_STATUSES),
+                name='bookings_active_dates_idx',
+            ),
+            # The expiry sweep reads the oldest pending bookings first.
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(status='pending'),
+                name='bookings_pending_created_idx',
+            ),
         ]
 
     def __str__(self):
@@ -38,22 +95,208 @@ class Booking(models.Model):
         if self.start_date >= self.end_date:
             raise ValidationError('End date must be after start date')
 
+        if not self.claims_dates():
+            return
+        blocked = BlockedDateRange.objects.filter(
+            property_id=self.booking_property_id
+        ).overlapping(self.start_date, self.end_date)
+        if blocked.exists():
+            raise ValidationError(UNAVAILABLE_MESSAGE)
+        if overlap_enforced_by_database():
+            return
         # Check for overlapping bookings
         overlapping = Booking.objects.filter(
-            booking_property=self.booking_property,
-            status__in=['pending', 'confirmed']
-        ).exclude(booking_id=self.booking_id).filter(
-            models.Q(start_date__lte=self.end_date) &
-            models.Q(end_date__gte=self.start_date)
-        )
+            booking_property_id=self.booking_property_id
+        ).active().overlapping(self.start_date, self.end_date).exclude(booking_id=self.booking_id)
 
         if overlapping.exists():
-            raise ValidationError('This property is already booked for the selected dates')
+            raise ValidationError(UNAVAILABLE_MESSAGE)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+
+    def _remember_loaded_values(self):
+        self._loaded_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields if field.attname in self.__dict__
+        }
+
+    def changed_fields(self):
+        """Names of the concrete fields set since the instance was loaded or saved."""
+        loaded = getattr(self, '_loaded_values', {})
+        return {
+            field.name for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+            and (field.attname not in loaded or loaded[field.attname] != self.__dict__[field.attname])
+        }
+
+    def claims_dates(self):
+        """Whether saving could make this booking overlap another active one."""
+        if self.status not in ACTIVE_STATUSES:
+            return False
+        loaded = getattr(self, '_loaded_values', None)
+        if self._state.adding or loaded is None:
+            return True
+        return (
+            loaded.get('status') not in ACTIVE_STATUSES
+            or not self.changed_fields().isdisjoint(('booking_property', 'start_date', 'end_date'))
+        )
+
+    def _stored_values(self, *attnames):
+        loaded = getattr(self, '_loaded_values', {})
+        if all(attname in loaded for attname in attnames):
+            return {attname: loaded[attname] for attname in attnames}
+        return Booking.objects.filter(pk=self.pk).values(*attnames).first()
 
     def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        if not adding and kwargs.get('update_fields') is None and hasattr(self, '_loaded_values'):
+            # Write only what changed, e.g. a status flip is a single UPDATE.
+            kwargs['update_fields'] = self.changed_fields() | {'updated_at'}
+        claims_dates = self.claims_dates()
+        calendar_changed = adding or not self.changed_fields().isdisjoint(
+            ('status', 'start_date', 'end_date', 'booking_property')
+        )
+        try:
+            with transaction.atomic():
+                if claims_dates and not overlap_enforced_by_database():
+                    # Serialize overlap checks per property.
+                    Property.objects.select_for_update().filter(pk=self.booking_property_id).first()
+                # Foreign keys are enforced by the database and the random
+                # primary key is the only unique column.
+                self.full_clean(exclude=['booking_property', 'user'], validate_unique=False)
+                stored = None if adding or not calendar_changed else self._stored_values(*STATS_FIELDS)
+                super().save(*args, **kwargs)
+                if calendar_changed:
+                    self._apply_changes(stored, {attname: getattr(self, attname) for attname in STATS_FIELDS})
+        except IntegrityError as exc:
+            if OVERLAP_CONSTRAINT not in str(exc):
+                raise
+            raise ValidationError(UNAVAILABLE_MESSAGE)
+        self._remember_loaded_values()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            stored = self._stored_values(*STATS_FIELDS)
+            # One by one, so each payment takes its revenue out of the daily stats.
+            for payment in self.payments.all():
+                payment.delete()
+            result = super().delete(*args, **kwargs)
+            if stored is not None:
+                self._apply_changes(stored, None)
+        return result
+
+    def _apply_changes(self, old, new):
+        """Move the popularity, calendar and daily stats of a booking from its ``old`` to its ``new`` values."""
+        was_confirmed = old is not None and old['status'] == 'confirmed'
+        is_confirmed = new is not None and new['status'] == 'confirmed'
+        old_property_id = old and old['booking_property_id']
+        new_property_id = new and new['booking_property_id']
+        moved = old_property_id != new_property_id
+        # Confirmed bookings feed the property's popularity ranking.
+        if was_confirmed and (not is_confirmed or moved):
+            Booking._refresh_booking_heat(old_property_id)
+        if is_confirmed and (not was_confirmed or moved):
+            Booking._refresh_booking_heat(new_property_id)
+        for property_id in {old_property_id, new_property_id} - {None}:
+            invalidate_calendar(property_id)
+        if old is not None:
+            PropertyDailyStats.apply_booking(old, -1)
+        if new is not None:
+            PropertyDailyStats.apply_booking(new, 1)
+        if old is not None and new is not None:
+            # Payments count as revenue of the booking's property unless it is
+            # canceled; created and deleted bookings have no payments here.
+            counted_before = old_property_id if old['status'] != 'canceled' else None
+            counted_after = new_property_id if new['status'] != 'canceled' else None
+            if counted_before != counted_after:
+                if counted_before is not None:
+                    PropertyDailyStats.apply_booking_revenue(self.pk, counted_before, -1)
+                if counted_after is not None:
+                    PropertyDailyStats.apply_booking_revenue(self.pk, counted_after, 1)
+
+    @staticmethod
+    def _refresh_booking_heat(property_id):
+        # Recomputed with decay_popularity's weights instead of stepped by a
+        # fixed amount, which would drift from the decayed stored value.
+        now = timezone.now()
+        recent = Booking.objects.filter(
+            booking_property_id=property_id, status='confirmed', created_at__gt=now - BOOKING_WINDOW,
+        ).values_list('created_at', flat=True)
+        Property.set_booking_heat(property_id, sum(booking_weight(created_at, now) for created_at in recent))
 
     @property
     def nights(self):
         return (self.end_date - self.start_date).days
+
+
+class PropertyDailyStats(models.Model):
+    """
+    Per-property, per-day rollup behind the host dashboard, kept current by
+    Booking and Payment writes and rebuilt by ``rebuild_daily_stats``.
+
+    Confirmed bookings count a booked night on each night of the stay and an
+    arrival, with its lead time in days, on the check-in date. Canceled
+    bookings count a cancellation on the check-in date. Successful payments
+    add to the revenue of the day they were made while their booking is not
+    canceled.
+    """
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    booked_nights = models.IntegerField(default=0)
+    arrivals = models.IntegerField(default=0)
+    lead_time_days = models.IntegerField(default=0)
+    cancellations = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'property_daily_stats'
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'date'], name='property_daily_stats_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Stats for {self.property_id} on {self.date}"
+
+    @classmethod
+    def _ensure_rows(cls, property_id, first, last):
+        cls.objects.bulk_create([
+            cls(property_id=property_id, date=first + datetime.timedelta(days=offset))
+            for offset in range((last - first).days + 1)
+        ], ignore_conflicts=True)
+
+    @classmethod
+    def apply_booking(cls, values, sign):
+        """Add (``sign`` 1) or remove (-1) a booking's contribution, given its STATS_FIELDS values."""
+        property_id, start_date, end_date = values['booking_property_id'], values['start_date'], values['end_date']
+        if values['status'] == 'confirmed':
+            last_night = end_date - datetime.timedelta(days=1)
+            cls._ensure_rows(property_id, start_date, last_night)
+            lead_time = max((start_date - timezone.localdate(values['created_at'])).days, 0)
+            cls.objects.filter(property_id=property_id, date__range=(start_date, last_night)).update(
+                booked_nights=F('booked_nights') + sign,
+                arrivals=F('arrivals') + Case(When(date=start_date, then=sign), default=0),
+                lead_time_days=F('lead_time_days') + Case(When(date=start_date, then=sign * lead_time), default=0),
+            )
+        elif values['status'] == 'canceled':
+            cls.add_cancellations(property_id, start_date, sign)
+
+    @classmethod
+    def add_cancellations(cls, property_id, date, count):
+        cls._ensure_rows(property_id, date, date)
+        cls.objects.filter(property_id=property_id, date=date).update(cancellations=F('cancellations') + count)
+
+    @classmethod
+    def apply_payment(cls, property_id, date, amount):
+        cls._ensure_rows(property_id, date, date)
+        cls.objects.filter(property_id=property_id, date=date).update(revenue=F('revenue') + amount)
+
+    @classmethod
+    def apply_booking_revenue(cls, booking_id, property_id, sign):
+        """Add (``sign`` 1) or remove (-1) the revenue of a booking's successful payments."""
+        payments = apps.get_model('payments', 'Payment').objects.filter(booking_id=booking_id, is_successful=True)
+        for payment_date, amount in payments.values_list('payment_date', 'amount'):
+            cls.apply_payment(property_id, timezone.localdate(payment_date), sign * amount)
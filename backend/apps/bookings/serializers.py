@@ -1,10 +1,12 @@
 from rest_framework import serializers
+from airbnb_project.serializers import SparseFieldsMixin
 from .models import Booking
+from apps.properties.models import preview_images_prefetch
 from apps.properties.serializers import PropertyListSerializer
 from apps.users.serializers import UserSerializer
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     property = PropertyListSerializer(source='booking_property', read_only=True)
     user = UserSerializer(read_only=True)
     nights = serializers.ReadOnlyField()
@@ -14,6 +16,22 @@ class BookingSerializer(serializers.ModelSerializer):
         fields = ['booking_id', 'property', 'user', 'start_date', 'end_date',
                   'total_price', 'status', 'guests', 'nights', 'created_at']
         read_only_fields = ['booking_id', 'created_at']
+        expandable_fields = {'property': 'booking_property_id', 'user': 'user_id'}
+
+    @classmethod
+    def prepare_queryset(cls, queryset, names, expanded):
+        if 'property' in expanded:
+            queryset = queryset.select_related('booking_property__host').prefetch_related(
+                preview_images_prefetch('booking_property__images')
+            )
+        if 'user' in expanded:
+            queryset = queryset.select_related('user')
+        return queryset
+
+    def get_value_fields(self, prefix):
+        return {
+            'nights': ([f'{prefix}start_date', f'{prefix}end_date'], lambda start, end: (end - start).days),
+        }
 
 
 class BookingCreateSerializer(serializers.ModelSerializer):
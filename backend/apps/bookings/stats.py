@@ -0,0 +1,115 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+from apps.payments.models import Payment
+from apps.properties.models import Property
+from .models import Booking, PropertyDailyStats
+
+GRANULARITIES = {'day': None, 'week': TruncWeek, 'month': TruncMonth}
+# Longest span a stats request may cover.
+MAX_STATS_DAYS = 731
+CENTS = Decimal('0.01')
+STATS_COLUMNS = ('booked_nights', 'arrivals', 'lead_time_days', 'cancellations', 'revenue')
+
+
+def period_start(date, granularity):
+    if granularity == 'week':
+        return date - datetime.timedelta(days=date.weekday())
+    if granularity == 'month':
+        return date.replace(day=1)
+    return date
+
+
+def next_period(start, granularity):
+    if granularity == 'week':
+        return start + datetime.timedelta(days=7)
+    if granularity == 'month':
+        return (start + datetime.timedelta(days=32)).replace(day=1)
+    return start + datetime.timedelta(days=1)
+
+
+def summarize(totals, days, listings):
+    arrivals = totals['arrivals']
+    available_nights = days * listings
+    return {
+        'booked_nights': totals['booked_nights'],
+        'available_nights': available_nights,
+        'occupancy': round(totals['booked_nights'] / available_nights, 4) if available_nights else None,
+        'revenue': str(Decimal(totals['revenue']).quantize(CENTS)),
+        'arrivals': arrivals,
+        'cancellations': totals['cancellations'],
+        'average_lead_time_days': round(totals['lead_time_days'] / arrivals, 1) if arrivals else None,
+    }
+
+
+def host_stats(host, first, last, granularity='day'):
+    """
+    Occupancy, revenue, arrivals, cancellations and lead time of a host's
+    properties from ``first`` to ``last`` (inclusive), in total and per period,
+    aggregated in the database from PropertyDailyStats.
+    """
+    rows = PropertyDailyStats.objects.filter(property__host=host, date__range=(first, last))
+    trunc = GRANULARITIES[granularity]
+    rows = rows.annotate(period=trunc('date') if trunc else F('date')).values('period').annotate(
+        **{column: Sum(column) for column in STATS_COLUMNS}
+    ).order_by('period')
+    by_period = {row['period']: row for row in rows}
+    listings = Property.objects.filter(host=host, is_active=True).count()
+
+    empty = dict.fromkeys(STATS_COLUMNS, 0)
+    totals = dict(empty)
+    periods = []
+    start = period_start(first, granularity)
+    while start <= last:
+        end = next_period(start, granularity)
+        days = (min(end - datetime.timedelta(days=1), last) - max(start, first)).days + 1
+        row = by_period.get(start, empty)
+        for column in STATS_COLUMNS:
+            totals[column] += row[column]
+        periods.append({'period': start.isoformat(), **summarize(row, days, listings)})
+        start = end
+    return {
+        'from': first.isoformat(),
+        'to': last.isoformat(),
+        'granularity': granularity,
+        'properties': listings,
+        'totals': summarize(totals, (last - first).days + 1, listings),
+        'periods': periods,
+    }
+
+
+def rebuild_daily_stats(batch_size=1000):
+    """Recompute every PropertyDailyStats row from bookings and payments. Returns the row count."""
+    stats = defaultdict(lambda: dict.fromkeys(STATS_COLUMNS, 0))
+    bookings = Booking.objects.filter(status__in=('confirmed', 'canceled')).values_list(
+        'booking_property_id', 'start_date', 'end_date', 'status', 'created_at'
+    )
+    for property_id, start_date, end_date, status, created_at in bookings.iterator(chunk_size=5000):
+        if status == 'canceled':
+            stats[property_id, start_date]['cancellations'] += 1
+            continue
+        for offset in range((end_date - start_date).days):
+            stats[property_id, start_date + datetime.timedelta(days=offset)]['booked_nights'] += 1
+        arrival = stats[property_id, start_date]
+        arrival['arrivals'] += 1
+        arrival['lead_time_days'] += max((start_date - timezone.localdate(created_at)).days, 0)
+
+    payments = Payment.objects.filter(is_successful=True).exclude(booking__status='canceled').annotate(
+        day=TruncDate('payment_date', tzinfo=timezone.get_current_timezone())
+    ).values('booking__booking_property_id', 'day').annotate(total=Sum('amount')).order_by()
+    for row in payments:
+        stats[row['booking__booking_property_id'], row['day']]['revenue'] += row['total']
+
+    items = list(stats.items())
+    with transaction.atomic():
+        PropertyDailyStats.objects.all().delete()
+        for start in range(0, len(items), batch_size):
+            PropertyDailyStats.objects.bulk_create([
+                PropertyDailyStats(property_id=property_id, date=date, **values)
+                for (property_id, date), values in items[start:start + batch_size]
+            ])
+    return len(items)
@@ -0,0 +1,175 @@
+import datetime
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from airbnb_project.querybudget import query_budget
+from apps.payments.models import Payment
+from apps.properties.models import Property, PropertyImage
+from apps.users.models import User
+from .models import Booking, PropertyDailyStats, overlap_enforced_by_database
+from .stats import rebuild_daily_stats
+from .views import BookingDetailView, BookingListView, HostBookingsView
+
+
+class BookingSaveQueryTests(TestCase):
+    """Booking.save() only checks availability when a save can claim new dates."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = User.objects.create_user('host@example.com', 'password', first_name='Host', last_name='User')
+        cls.guest = User.objects.create_user('guest@example.com', 'password', first_name='Guest', last_name='User')
+        cls.property = Property.objects.create(
+            host=cls.host, name='Flat', description='A flat', location='Lisbon', pricepernight=100,
+        )
+
+    def reserve(self, start=datetime.date(2030, 1, 1), nights=2):
+        return Booking.objects.reserve(self.property, self.guest, start, start + datetime.timedelta(days=nights), 1)
+
+    def save_queries(self, booking):
+        with CaptureQueriesContext(connection) as queries:
+            booking.save()
+        return [query['sql'] for query in queries.captured_queries]
+
+    def assertChecksAvailability(self, queries, checked=True):
+        overlap = [sql for sql in queries if sql.startswith('SELECT 1 AS "a" FROM "bookings"')]
+        lock = [sql for sql in queries if sql.startswith('SELECT') and 'FROM "properties"' in sql]
+        self.assertEqual(len(overlap), 1 if checked else 0, queries)
+        self.assertEqual(len(lock), 1 if checked and not overlap_enforced_by_database() else 0, queries)
+
+    def test_create_checks_availability(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.reserve()
+        self.assertChecksAvailability([query['sql'] for query in queries.captured_queries])
+
+    def test_status_only_save_skips_overlap_query_and_lock(self):
+        booking = Booking.objects.get(pk=self.reserve().pk)
+        booking.status = 'confirmed'
+        queries = self.save_queries(booking)
+        self.assertChecksAvailability(queries, checked=False)
+        updates = [sql for sql in queries if sql.startswith('UPDATE "bookings"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"status"', updates[0])
+        self.assertNotIn('"start_date"', updates[0])
+
+    def test_cancel_skips_overlap_query_and_lock(self):
+        booking = self.reserve()
+        booking.status = 'canceled'
+        self.assertChecksAvailability(self.save_queries(booking), checked=False)
+
+    def test_unrelated_field_save_is_a_single_update(self):
+        booking = self.reserve()
+        booking.guests = 2
+        # The savepoint pair of the atomic block around the UPDATE.
+        with self.assertNumQueries(3):
+            booking.save()
+
+    def test_date_change_checks_availability(self):
+        booking = self.reserve()
+        booking.end_date += datetime.timedelta(days=2)
+        self.assertChecksAvailability(self.save_queries(booking))
+
+    def test_reactivating_a_canceled_booking_checks_availability(self):
+        booking = self.reserve()
+        booking.status = 'canceled'
+        booking.save()
+        booking.status = 'pending'
+        self.assertChecksAvailability(self.save_queries(booking))
+
+    def test_date_change_into_another_booking_is_rejected(self):
+        self.reserve(start=datetime.date(2030, 1, 10))
+        booking = self.reserve()
+        booking.end_date = datetime.date(2030, 1, 11)
+        with self.assertRaises(ValidationError):
+            booking.save()
+
+
+class DailyStatsRevenueTests(TestCase):
+    """Payments of canceled bookings do not count as revenue."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = User.objects.create_user('host@example.com', 'password', first_name='Host', last_name='User')
+        cls.property = Property.objects.create(
+            host=cls.host, name='Flat', description='A flat', location='Lisbon', pricepernight=100,
+        )
+
+    def revenue(self):
+        return PropertyDailyStats.objects.filter(property=self.property).aggregate(total=Sum('revenue'))['total']
+
+    def paid_booking(self):
+        booking = Booking.objects.reserve(
+            self.property, self.host, datetime.date(2030, 1, 1), datetime.date(2030, 1, 3), 1,
+        )
+        Payment.objects.create(booking=booking, amount=Decimal('200.00'), payment_method='paypal', is_successful=True)
+        booking.status = 'confirmed'
+        booking.save()
+        return booking
+
+    def test_cancel_reverses_revenue(self):
+        booking = self.paid_booking()
+        self.assertEqual(self.revenue(), Decimal('200.00'))
+        booking.status = 'canceled'
+        booking.save()
+        self.assertEqual(self.revenue(), 0)
+        booking.payments.get().delete()
+        self.assertEqual(self.revenue(), 0)
+
+    def test_rebuild_matches_incremental_revenue(self):
+        self.paid_booking().delete()
+        canceled = self.paid_booking()
+        canceled.status = 'canceled'
+        canceled.save()
+        incremental = self.revenue()
+        rebuild_daily_stats()
+        self.assertEqual(self.revenue(), incremental)
+
+
+@override_settings(QUERY_BUDGETS_ENFORCED=True)
+class BookingQueryBudgetTests(TestCase):
+    """Booking reads stay within their views' query budgets, authentication included."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = User.objects.create_user('host@example.com', 'password', first_name='Host', last_name='User')
+        cls.guest = User.objects.create_user('guest@example.com', 'password', first_name='Guest', last_name='User')
+        properties = Property.objects.bulk_create([
+            Property(host=cls.host, name=f'Flat {index}', description='A flat', location='Lisbon', pricepernight=100)
+            for index in range(5)
+        ])
+        PropertyImage.objects.bulk_create([
+            PropertyImage(property=prop, image=f'properties/{prop.pk}.jpg', is_primary=True) for prop in properties
+        ])
+        first_day = datetime.date(2030, 1, 1)
+        cls.bookings = Booking.objects.bulk_create([
+            Booking(booking_property=properties[index % 5], user=cls.guest,
+                    start_date=first_day + datetime.timedelta(days=3 * index),
+                    end_date=first_day + datetime.timedelta(days=3 * index + 2), guests=1, total_price=200)
+            for index in range(12)
+        ])
+
+    def get(self, view, url, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        with query_budget(view.query_budgets['GET'], url):
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response
+
+    def test_booking_list(self):
+        response = self.get(BookingListView, '/api/bookings/', self.guest)
+        self.assertEqual(response.data['count'], 12)
+        self.get(BookingListView, '/api/bookings/?expand=', self.guest)
+
+    def test_booking_detail(self):
+        booking = self.bookings[0]
+        self.get(BookingDetailView, f'/api/bookings/{booking.pk}/', self.guest)
+        self.get(BookingDetailView, f'/api/bookings/{booking.pk}/', self.host)
+
+    def test_host_bookings(self):
+        response = self.get(HostBookingsView, '/api/bookings/host/', self.host)
+        self.assertEqual(response.data['count'], 12)
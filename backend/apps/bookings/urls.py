@@ -3,12 +3,16 @@ from .views import (
     BookingListView,
     BookingCreateView,
     BookingDetailView,
-    HostBookingsView
+    HostBookingsView,
+    HostStatsView,
+    HostBookingsExportView
 )
 
 urlpatterns = [
     path('', BookingListView.as_view(), name='booking-list'),
     path('create/', BookingCreateView.as_view(), name='booking-create'),
     path('host/', HostBookingsView.as_view(), name='host-bookings'),
+    path('host/stats/', HostStatsView.as_view(), name='host-stats'),
+    path('host/export/', HostBookingsExportView.as_view(), name='host-bookings-export'),
     path('<uuid:booking_id>/', BookingDetailView.as_view(), name='booking-detail'),
 ]
@@ -1,8 +1,17 @@
+import datetime
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.core.exceptions import ValidationError
 from django.db.models import Q
+from airbnb_project.exports import ExportView
+from airbnb_project.pagination import KeysetPagination
+from airbnb_project.querybudget import QueryBudgetMixin
+from airbnb_project.serializers import SparseFieldsViewMixin, ValuesListMixin
 from .models import Booking
+from .stats import GRANULARITIES, MAX_STATS_DAYS, host_stats
 from .serializers import (
     BookingSerializer,
     BookingCreateSerializer,
@@ -11,12 +20,15 @@ from .serializers import (
 from apps.properties.models import Property
 
 
-class BookingListView(generics.ListAPIView):
+class BookingListView(QueryBudgetMixin, ValuesListMixin, SparseFieldsViewMixin, generics.ListAPIView):
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    # User, count and page.
+    query_budgets = {'GET': 3}
 
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user)
+        return Booking.objects.filter(user=self.request.user).order_by('-created_at')
 
 
 class BookingCreateView(generics.CreateAPIView):
@@ -41,34 +53,10 @@ class BookingCreateView(generics.CreateAPIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Check availability
-        overlapping = Booking.objects.filter(
-            booking_property=property_obj,
-            status__in=['pending', 'confirmed']
-        ).filter(
-            Q(start_date__lte=end_date) &
-            Q(end_date__gte=start_date)
-        )
-
-        if overlapping.exists():
-            return Response(
-                {'error': 'Property is not available for selected dates'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Calculate total price
-        nights = (end_date - start_date).days
-        total_price = property_obj.pricepernight * nights
-
-        booking = Booking.objects.create(
-            booking_property=property_obj,
-            user=request.user,
-            start_date=start_date,
-            end_date=end_date,
-            guests=guests,
-            total_price=total_price,
-            status='pending'
-        )
+        try:
+            booking = Booking.objects.reserve(property_obj, request.user, start_date, end_date, guests)
+        except ValidationError as exc:
+            return Response({'error': ' '.join(exc.messages)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(
             BookingSerializer(booking).data,
@@ -76,10 +64,12 @@ class BookingCreateView(generics.CreateAPIView):
         )
 
 
-class BookingDetailView(generics.RetrieveUpdateAPIView):
+class BookingDetailView(QueryBudgetMixin, SparseFieldsViewMixin, generics.RetrieveUpdateAPIView):
     queryset = Booking.objects.all()
     lookup_field = 'booking_id'
     permission_classes = [IsAuthenticated]
+    # User, booking with its property, host and guest, and the card image.
+    query_budgets = {'GET': 3}
 
     def get_serializer_class(self):
         if self.request.method == 'PATCH':
@@ -88,13 +78,70 @@ class BookingDetailView(generics.RetrieveUpdateAPIView):
 
     def get_queryset(self):
         return Booking.objects.filter(
-            Q(user=self.request.user) | Q(property__host=self.request.user)
+            Q(user=self.request.user) | Q(booking_property__host=self.request.user)
         )
 
 
-class HostBookingsView(generics.ListAPIView):
+class HostBookingsView(QueryBudgetMixin, ValuesListMixin, SparseFieldsViewMixin, generics.ListAPIView):
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 3}
+
+    def get_queryset(self):
+        return Booking.objects.filter(booking_property__host=self.request.user)
+
+
+class HostStatsView(APIView):
+    """
+    Occupancy and earnings of the host's properties from ``?from=`` to ``?to=``
+    (inclusive, default the last 30 days) per ``?granularity=day|week|month``,
+    answered from the daily stats rollup.
+    """
+    permission_classes = [IsAuthenticated]
+    default_days = 30
+
+    def get(self, request):
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in GRANULARITIES:
+            return Response({'error': 'granularity must be day, week or month'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            last = self.parse_date('to') or timezone.localdate()
+            first = self.parse_date('from') or last - datetime.timedelta(days=self.default_days - 1)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if first > last:
+            return Response({'error': 'from must not be after to'}, status=status.HTTP_400_BAD_REQUEST)
+        if (last - first).days >= MAX_STATS_DAYS:
+            return Response({'error': f'Stats cover at most {MAX_STATS_DAYS} days'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(host_stats(request.user, first, last, granularity))
+
+    def parse_date(self, param):
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f'{param} must be a date in YYYY-MM-DD format')
+
+
+class HostBookingsExportView(ExportView):
+    """Bookings of the host's properties, filtered on check-in date."""
+    columns = (
+        ('booking_id', 'booking_id'),
+        ('property_id', 'booking_property_id'),
+        ('property_name', 'booking_property__name'),
+        ('guest_email', 'user__email'),
+        ('start_date', 'start_date'),
+        ('end_date', 'end_date'),
+        ('guests', 'guests'),
+        ('total_price', 'total_price'),
+        ('status', 'status'),
+        ('created_at', 'created_at'),
+    )
+    date_field = 'start_date'
+    filename = 'bookings'
 
     def get_queryset(self):
-        return Booking.objects.filter(property__host=self.request.user)
+        return Booking.objects.filter(booking_property__host=self.request.user).order_by('start_date', 'booking_id')
@@ -17,6 +17,8 @@ class Message(models.Model):
         indexes = [
             models.Index(fields=['sender']),
             models.Index(fields=['recipient']),
+            models.Index(fields=['sender', 'sent_at', 'message_id']),
+            models.Index(fields=['recipient', 'sent_at', 'message_id']),
         ]
 
     def __str__(self):
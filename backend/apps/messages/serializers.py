@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from airbnb_project.serializers import SparseFieldsMixin
 from .models import Message
 from apps.users.serializers import UserSerializer
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
     recipient = UserSerializer(read_only=True)
 
@@ -12,6 +13,12 @@ class MessageSerializer(serializers.ModelSerializer):
         fields = ['message_id', 'sender', 'recipient', 'message_body',
                   'is_read', 'sent_at']
         read_only_fields = ['message_id', 'sent_at']
+        expandable_fields = {'sender': 'sender_id', 'recipient': 'recipient_id'}
+
+    @classmethod
+    def prepare_queryset(cls, queryset, names, expanded):
+        related = [name for name in ('sender', 'recipient') if name in expanded]
+        return queryset.select_related(*related) if related else queryset
 
 
 class MessageCreateSerializer(serializers.ModelSerializer):
@@ -2,14 +2,17 @@ from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Q
+from airbnb_project.pagination import KeysetPagination
+from airbnb_project.serializers import SparseFieldsViewMixin, ValuesListMixin
 from .models import Message
 from .serializers import MessageSerializer, MessageCreateSerializer
 from apps.users.models import User
 
 
-class MessageListView(generics.ListAPIView):
+class MessageListView(ValuesListMixin, SparseFieldsViewMixin, generics.ListAPIView):
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -18,7 +21,7 @@ class MessageListView(generics.ListAPIView):
         ).order_by('-sent_at')
 
 
-class ConversationView(generics.ListAPIView):
+class ConversationView(ValuesListMixin, SparseFieldsViewMixin, generics.ListAPIView):
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
 
@@ -63,7 +66,7 @@ class MessageCreateView(generics.CreateAPIView):
         )
 
 
-class MessageDetailView(generics.RetrieveAPIView):
+class MessageDetailView(SparseFieldsViewMixin, generics.RetrieveAPIView):
     queryset = Message.objects.all()
     serializer_class = MessageSerializer
     lookup_field = 'message_id'
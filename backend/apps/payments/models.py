@@ -1,6 +1,7 @@
 import uuid
-from django.db import models
-from apps.bookings.models import Booking
+from django.db import models, transaction
+from django.utils import timezone
+from apps.bookings.models import Booking, PropertyDailyStats
 
 
 class Payment(models.Model):
@@ -28,3 +29,49 @@ class Payment(models.Model):
 
     def __str__(self):
         return f"Payment {self.payment_id} - {self.amount}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(name in instance.__dict__ for name in ('booking_id', 'payment_date', 'amount', 'is_successful')):
+            instance._loaded_revenue = instance._revenue()
+        return instance
+
+    def _revenue(self):
+        """(booking_id, day, amount) this payment adds to its property's daily stats, or None."""
+        if not self.is_successful:
+            return None
+        return self.booking_id, timezone.localdate(self.payment_date), self.amount
+
+    def _stored_revenue(self):
+        if hasattr(self, '_loaded_revenue'):
+            return self._loaded_revenue
+        stored = Payment.objects.filter(pk=self.pk).first()
+        return stored and stored._revenue()
+
+    def _apply_revenue(self, revenue, sign):
+        booking_id, day, amount = revenue
+        booking = Booking.objects.filter(pk=booking_id).values_list('booking_property_id', 'status').first()
+        # Payments of canceled bookings were taken out of the revenue when they were canceled.
+        if booking is not None and booking[1] != 'canceled':
+            PropertyDailyStats.apply_payment(booking[0], day, sign * amount)
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            previous = None if adding else self._stored_revenue()
+            super().save(*args, **kwargs)
+            current = self._revenue()
+            if previous != current:
+                if previous:
+                    self._apply_revenue(previous, -1)
+                if current:
+                    self._apply_revenue(current, 1)
+        self._loaded_revenue = current
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            revenue = self._stored_revenue()
+            if revenue:
+                self._apply_revenue(revenue, -1)
+            return super().delete(*args, **kwargs)
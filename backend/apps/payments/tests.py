@@ -0,0 +1,44 @@
+import datetime
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from airbnb_project.querybudget import query_budget
+from apps.bookings.models import Booking
+from apps.properties.models import Property
+from apps.users.models import User
+from .models import Payment
+from .views import PaymentListView
+
+
+@override_settings(QUERY_BUDGETS_ENFORCED=True)
+class PaymentQueryBudgetTests(TestCase):
+    """The payment list stays within its query budget, authentication included."""
+
+    @classmethod
+    def setUpTestData(cls):
+        host = User.objects.create_user('host@example.com', 'password', first_name='Host', last_name='User')
+        cls.guest = User.objects.create_user('guest@example.com', 'password', first_name='Guest', last_name='User')
+        properties = Property.objects.bulk_create([
+            Property(host=host, name=f'Flat {index}', description='A flat', location='Lisbon', pricepernight=100)
+            for index in range(5)
+        ])
+        first_day = datetime.date(2030, 1, 1)
+        bookings = Booking.objects.bulk_create([
+            Booking(booking_property=properties[index % 5], user=cls.guest,
+                    start_date=first_day + datetime.timedelta(days=3 * index),
+                    end_date=first_day + datetime.timedelta(days=3 * index + 2), guests=1, total_price=200)
+            for index in range(12)
+        ])
+        Payment.objects.bulk_create([
+            Payment(booking=booking, amount=Decimal('200.00'), payment_method='paypal', is_successful=True)
+            for booking in bookings
+        ])
+
+    def test_payment_list(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.guest).access_token}')
+        with query_budget(PaymentListView.query_budgets['GET'], 'GET /api/payments/'):
+            response = client.get('/api/payments/')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['count'], 12)
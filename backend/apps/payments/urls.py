@@ -2,11 +2,13 @@ from django.urls import path
 from .views import (
     PaymentListView,
     PaymentCreateView,
-    PaymentDetailView
+    PaymentDetailView,
+    PaymentExportView
 )
 
 urlpatterns = [
     path('', PaymentListView.as_view(), name='payment-list'),
     path('create/', PaymentCreateView.as_view(), name='payment-create'),
+    path('export/', PaymentExportView.as_view(), name='payment-export'),
     path('<uuid:payment_id>/', PaymentDetailView.as_view(), name='payment-detail'),
 ]
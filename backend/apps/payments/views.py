@@ -1,14 +1,18 @@
+from django.db import transaction
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from airbnb_project.exports import ExportView
+from airbnb_project.querybudget import QueryBudgetMixin
 from .models import Payment
 from .serializers import PaymentSerializer, PaymentCreateSerializer
 from apps.bookings.models import Booking
 
 
-class PaymentListView(generics.ListAPIView):
+class PaymentListView(QueryBudgetMixin, generics.ListAPIView):
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 3}
 
     def get_queryset(self):
         return Payment.objects.filter(booking__user=self.request.user)
@@ -25,31 +29,39 @@ class PaymentCreateView(generics.CreateAPIView):
 
         booking_id = serializer.validated_data['booking_id']
 
-        try:
-            booking = Booking.objects.get(booking_id=booking_id)
-        except Booking.DoesNotExist:
-            return Response(
-                {'error': 'Booking not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        # Locking the booking keeps the pending expiry sweep from canceling it mid-payment.
+        with transaction.atomic():
+            try:
+                booking = Booking.objects.select_for_update().get(booking_id=booking_id)
+            except Booking.DoesNotExist:
+                return Response(
+                    {'error': 'Booking not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
 
-        if booking.user != request.user:
-            return Response(
-                {'error': 'You do not have permission to pay for this booking'},
-                status=status.HTTP_403_FORBIDDEN
-            )
+            if booking.user_id != request.user.pk:
+                return Response(
+                    {'error': 'You do not have permission to pay for this booking'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
 
-        # Create payment
-        payment = Payment.objects.create(
-            booking=booking,
-            amount=serializer.validated_data['amount'],
-            payment_method=serializer.validated_data['payment_method'],
-            is_successful=True  # In production, integrate with Stripe/PayPal
-        )
+            if booking.status == 'canceled':
+                return Response(
+                    {'error': 'This booking has been canceled or has expired'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # Create payment
+            payment = Payment.objects.create(
+                booking=booking,
+                amount=serializer.validated_data['amount'],
+                payment_method=serializer.validated_data['payment_method'],
+                is_successful=True  # In production, integrate with Stripe/PayPal
+            )
 
-        # Update booking status
-        booking.status = 'confirmed'
-        booking.save()
+            # Update booking status
+            booking.status = 'confirmed'
+            booking.save()
 
         return Response(
             PaymentSerializer(payment).data,
@@ -65,3 +77,25 @@ class PaymentDetailView(generics.RetrieveAPIView):
 
     def get_queryset(self):
         return Payment.objects.filter(booking__user=self.request.user)
+
+
+class PaymentExportView(ExportView):
+    """Payments for bookings of the host's properties, filtered on payment date."""
+    columns = (
+        ('payment_id', 'payment_id'),
+        ('booking_id', 'booking_id'),
+        ('property_id', 'booking__booking_property_id'),
+        ('property_name', 'booking__booking_property__name'),
+        ('amount', 'amount'),
+        ('payment_method', 'payment_method'),
+        ('transaction_id', 'transaction_id'),
+        ('payment_date', 'payment_date'),
+        ('is_successful', 'is_successful'),
+    )
+    date_field = 'payment_date'
+    filename = 'payments'
+
+    def get_queryset(self):
+        return Payment.objects.filter(
+            booking__booking_property__host=self.request.user
+        ).order_by('payment_date', 'payment_id')
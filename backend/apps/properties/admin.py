@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Property, PropertyImage
+from .models import BlockedDateRange, Property, PropertyImage
 
 
 class PropertyImageInline(admin.TabularInline):
@@ -9,10 +9,11 @@ class PropertyImageInline(admin.TabularInline):
 
 @admin.register(Property)
 class PropertyAdmin(admin.ModelAdmin):
-    list_display = ['name', 'host', 'location', 'pricepernight', 'is_active', 'created_at']
+    list_display = ['name', 'host', 'location', 'pricepernight', 'average_rating', 'is_active', 'created_at']
     list_filter = ['is_active', 'created_at', 'location']
     search_fields = ['name', 'description', 'location']
     ordering = ['-created_at']
+    readonly_fields = ['rating_sum', 'review_count', 'average_rating']
     inlines = [PropertyImageInline]
 
 
@@ -20,3 +21,9 @@ class PropertyAdmin(admin.ModelAdmin):
 class PropertyImageAdmin(admin.ModelAdmin):
     list_display = ['property', 'is_primary', 'created_at']
     list_filter = ['is_primary', 'created_at']
+
+
+@admin.register(BlockedDateRange)
+class BlockedDateRangeAdmin(admin.ModelAdmin):
+    list_display = ['property', 'start_date', 'end_date', 'reason', 'created_at']
+    search_fields = ['property__name', 'reason']
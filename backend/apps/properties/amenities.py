@@ -0,0 +1,149 @@
+import re
+from django.db import connections
+from django.db.models import BooleanField, Count, F, Func
+
+# Canonical amenity vocabulary as (code, label, aliases). The position of an
+# entry is its bit in Property.amenity_mask, so new amenities must be appended
+# and existing ones never reordered or removed.
+AMENITIES = (
+    ('wifi', 'WiFi', ('wi-fi', 'wireless internet', 'internet')),
+    ('kitchen', 'Kitchen', ('chef kitchen', 'full kitchen')),
+    ('kitchenette', 'Kitchenette', ()),
+    ('parking', 'Parking', ('street parking', 'free parking')),
+    ('pool', 'Pool', ('infinity pool', 'swimming pool')),
+    ('hot_tub', 'Hot Tub', ('jacuzzi', 'japanese tub')),
+    ('air_conditioning', 'Air Conditioning', ('ac', 'a/c')),
+    ('heating', 'Heating', ('heated floors',)),
+    ('fireplace', 'Fireplace', ('wood stove',)),
+    ('washer', 'Washer', ('washing machine', 'laundry')),
+    ('dryer', 'Dryer', ()),
+    ('tv', 'TV', ('television', 'cable tv')),
+    ('workspace', 'Workspace', ('dedicated workspace',)),
+    ('gym', 'Gym', ('gym access', 'fitness center')),
+    ('elevator', 'Elevator', ()),
+    ('pet_friendly', 'Pet Friendly', ('pets allowed',)),
+    ('smart_home', 'Smart Home', ('voice control',)),
+    ('security', '24/7 Security', ('security',)),
+    ('concierge', 'Concierge', ()),
+    ('bbq_grill', 'BBQ Grill', ('bbq', 'barbecue', 'grill')),
+    ('fire_pit', 'Fire Pit', ()),
+    ('garden', 'Garden', ('backyard',)),
+    ('patio', 'Patio', ('deck', 'porch', 'terrace', 'rooftop terrace', 'balcony')),
+    ('outdoor_shower', 'Outdoor Shower', ()),
+    ('hammock', 'Hammock', ()),
+    ('beach_access', 'Beach Access', ()),
+    ('lake_access', 'Lake Access', ()),
+    ('dock', 'Private Dock', ('dock', 'fishing dock')),
+    ('kayaks', 'Kayaks', ('kayak', 'canoe')),
+    ('ocean_view', 'Ocean View', ('ocean views',)),
+    ('mountain_view', 'Mountain View', ('mountain views',)),
+    ('bay_view', 'Bay View', ('bay views',)),
+    ('river_view', 'River View', ('river views',)),
+    ('forest_view', 'Forest View', ('forest views',)),
+    ('vineyard', 'Vineyard', ('vineyard views', 'wine tasting')),
+    ('wine_cellar', 'Wine Cellar', ()),
+    ('hiking', 'Hiking Trails', ('hiking', 'hiking access', 'nature trails')),
+    ('ski_storage', 'Ski Storage', ()),
+    ('bikes', 'Bikes', ('bike storage', 'bike rental')),
+    ('public_transit', 'Near Public Transit', ('near subway', 'near t station')),
+    ('near_parks', 'Near Parks', ()),
+    ('golf', 'Golf Nearby', ('golf',)),
+    ('historic', 'Historic Building', ('historic home', 'historic district')),
+    ('high_ceilings', 'High Ceilings', ()),
+    ('natural_light', 'Natural Light', ()),
+    ('library', 'Library', ()),
+    ('meditation_space', 'Meditation Space', ()),
+    ('stargazing', 'Stargazing', ()),
+    ('wildlife', 'Wildlife', ()),
+    ('farm_animals', 'Farm Animals', ()),
+    ('horse_stables', 'Horse Stables', ()),
+    ('treehouse', 'Treehouse', ()),
+)
+
+# amenity_mask is a signed 64-bit column.
+assert len(AMENITIES) <= 63
+
+AMENITY_BITS = {code: 1 << position for position, (code, _, _) in enumerate(AMENITIES)}
+AMENITY_LABELS = {code: label for code, label, _ in AMENITIES}
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _normalize(term):
+    return WHITESPACE_RE.sub(' ', term.strip().lower())
+
+
+_LOOKUP = {
+    _normalize(term): code
+    for code, label, aliases in AMENITIES
+    for term in (code, code.replace('_', ' '), label, *aliases)
+}
+
+
+def resolve_amenity(term):
+    """Map a code, label or alias to its canonical code, or None if unknown."""
+    return _LOOKUP.get(_normalize(term))
+
+
+def amenity_mask(text):
+    """Bitmask of the canonical amenities found in a comma-separated list."""
+    mask = 0
+    for term in (text or '').split(','):
+        code = resolve_amenity(term)
+        if code:
+            mask |= AMENITY_BITS[code]
+    return mask
+
+
+def mask_for_terms(terms):
+    """Bitmask requiring every given amenity, or None if any term is unknown."""
+    mask = 0
+    for term in terms:
+        code = resolve_amenity(term)
+        if code is None:
+            return None
+        mask |= AMENITY_BITS[code]
+    return mask
+
+
+def amenity_codes(mask):
+    return [code for code, _, _ in AMENITIES if mask & AMENITY_BITS[code]]
+
+
+def amenity_positions(mask):
+    return [position for position in range(len(AMENITIES)) if mask & (1 << position)]
+
+
+class HasAmenityBits(Func):
+    """``amenity_bits(mask) @> positions``, answered by the GIN expression index
+    created in migration 0013 (PostgreSQL only)."""
+
+    output_field = BooleanField()
+
+    def __init__(self, expression, positions):
+        super().__init__(expression)
+        self.positions = list(positions)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f'amenity_bits({sql}) @> %s::integer[]', (*params, self.positions)
+
+
+def filter_by_mask(queryset, mask):
+    """Restrict to properties offering every amenity in the mask."""
+    if connections[queryset.db].vendor == 'postgresql':
+        return queryset.filter(HasAmenityBits('amenity_mask', amenity_positions(mask)))
+    # Elsewhere the bitwise test scans the table; fine for development data.
+    return queryset.alias(matched_amenities=F('amenity_mask').bitand(mask)).filter(
+        matched_amenities=mask
+    )
+
+
+def amenity_facets(queryset):
+    """Count the properties offering each amenity, grouping rows by their mask."""
+    counts = dict.fromkeys(AMENITY_BITS, 0)
+    masks = queryset.order_by().values_list('amenity_mask').annotate(total=Count('pk'))
+    for mask, total in masks:
+        for code in amenity_codes(mask):
+            counts[code] += total
+    return counts
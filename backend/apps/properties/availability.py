@@ -0,0 +1,40 @@
+import re
+from datetime import timedelta
+from apps.bookings.models import Booking
+from .models import BlockedDateRange
+
+# Longest span a calendar request may cover.
+MAX_CALENDAR_DAYS = 366
+
+
+def unavailable_ranges(property_id, first, last):
+    """
+    (start_date, end_date) of the active bookings and blocked ranges of a
+    property that touch the days from ``first`` to ``last``, as one query.
+    """
+    bookings = Booking.objects.filter(
+        booking_property_id=property_id
+    ).active().overlapping(first, last).order_by().values_list('start_date', 'end_date')
+    blocked = BlockedDateRange.objects.filter(
+        property_id=property_id
+    ).overlapping(first, last).order_by().values_list('start_date', 'end_date')
+    return bookings.union(blocked, all=True)
+
+
+def availability_bitmap(property_id, first, last):
+    """One character per day from ``first`` to ``last``: '1' if it is free, '0' if not."""
+    days = bytearray(b'1' * ((last - first).days + 1))
+    for start_date, end_date in unavailable_ranges(property_id, first, last):
+        # Both ends are taken, as in BookingQuerySet.overlapping().
+        start = max((start_date - first).days, 0)
+        end = min((end_date - first).days, len(days) - 1)
+        days[start:end + 1] = b'0' * (end - start + 1)
+    return days.decode()
+
+
+def unavailable_runs(bitmap, first):
+    """The runs of taken days in a bitmap as inclusive (start, end) dates."""
+    return [
+        (first + timedelta(days=run.start()), first + timedelta(days=run.end() - 1))
+        for run in re.finditer('0+', bitmap)
+    ]
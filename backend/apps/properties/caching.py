@@ -0,0 +1,29 @@
+from airbnb_project.cache import response_cache
+
+# Every cached property response is scoped by ALL_NAMESPACE; list-style
+# responses also by LIST_NAMESPACE and a property's detail by its own namespace.
+# Lists filtered on dates are also scoped by AVAILABILITY_NAMESPACE, which
+# every booking or blocked-range change bumps.
+ALL_NAMESPACE = 'properties'
+LIST_NAMESPACE = 'property-list'
+AVAILABILITY_NAMESPACE = 'property-availability'
+
+
+def detail_namespace(property_id):
+    return f'property:{property_id}'
+
+
+def calendar_namespace(property_id):
+    return f'property-calendar:{property_id}'
+
+
+def invalidate_property(property_id):
+    response_cache.invalidate(LIST_NAMESPACE, detail_namespace(property_id))
+
+
+def invalidate_all_properties():
+    response_cache.invalidate(ALL_NAMESPACE)
+
+
+def invalidate_calendar(property_id):
+    response_cache.invalidate(calendar_namespace(property_id), AVAILABILITY_NAMESPACE)
@@ -0,0 +1,82 @@
+from collections import Counter
+from decimal import Decimal
+from django.db.models import Count, F, TextField, Value
+from django.db.models.functions import Cast, Floor
+from .amenities import AMENITIES, amenity_codes
+
+PRICE_BUCKET_SIZE = 50
+TOP_LOCATIONS = 10
+
+# Faceted expressions. Each facet is grouped on its own so the result stays
+# proportional to the distinct values of that facet, not to their product.
+FACET_EXPRESSIONS = {
+    'bedrooms': F('bedrooms'),
+    'bathrooms': F('bathrooms'),
+    'max_guests': F('max_guests'),
+    'location': F('location'),
+    'amenity_mask': F('amenity_mask'),
+    'price_bucket': Floor(F('pricepernight') / Value(Decimal(PRICE_BUCKET_SIZE))),
+}
+
+
+def _facet_rows(queryset, name, expression):
+    return queryset.annotate(
+        facet=Value(name), value=Cast(expression, TextField())
+    ).values('facet', 'value').annotate(total=Count('pk'))
+
+
+def property_facets(queryset):
+    """
+    Facet counts for a filtered property queryset: one GROUP BY per facet,
+    sent as a single UNION ALL query.
+    """
+    queryset = queryset.order_by()
+    total_rows = queryset.annotate(facet=Value('count'), value=Value('')).values(
+        'facet', 'value'
+    ).annotate(total=Count('pk'))
+    rows = total_rows.union(
+        *(_facet_rows(queryset, name, expression) for name, expression in FACET_EXPRESSIONS.items()),
+        all=True,
+    )
+
+    total = 0
+    facets = {name: Counter() for name in FACET_EXPRESSIONS}
+    for row in rows:
+        if row['facet'] == 'count':
+            total = row['total']
+        elif row['facet'] == 'location':
+            facets['location'][row['value']] += row['total']
+        else:
+            # Numeric values come back as text (SQLite may render 3 as 3.0).
+            facets[row['facet']][int(Decimal(row['value']))] += row['total']
+    amenities = Counter()
+    for mask, count in facets.pop('amenity_mask').items():
+        for code in amenity_codes(mask):
+            amenities[code] += count
+
+    return {
+        'count': total,
+        'bedrooms': _value_counts(facets['bedrooms']),
+        'bathrooms': _value_counts(facets['bathrooms']),
+        'max_guests': _value_counts(facets['max_guests']),
+        'price': [
+            {
+                'min': int(bucket) * PRICE_BUCKET_SIZE,
+                'max': (int(bucket) + 1) * PRICE_BUCKET_SIZE,
+                'count': count,
+            }
+            for bucket, count in sorted(facets['price_bucket'].items())
+        ],
+        'locations': [
+            {'value': location, 'count': count}
+            for location, count in facets['location'].most_common(TOP_LOCATIONS)
+        ],
+        'amenities': [
+            {'code': code, 'label': label, 'count': amenities[code]}
+            for code, label, _ in AMENITIES if amenities[code]
+        ],
+    }
+
+
+def _value_counts(counter):
+    return [{'value': value, 'count': count} for value, count in sorted(counter.items())]
@@ -0,0 +1,127 @@
+import django_filters
+from django.db.models import Exists, OuterRef
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from apps.bookings.models import Booking
+from .amenities import filter_by_mask, mask_for_terms
+from .geo import within_bbox, within_radius
+from .models import BlockedDateRange, Property
+from .search import search_properties
+
+
+DEFAULT_RADIUS_KM = 25
+MAX_RADIUS_KM = 1000
+
+
+class PropertyFilterSet(django_filters.FilterSet):
+    amenities = django_filters.CharFilter(method='filter_amenities')
+    guests = django_filters.NumberFilter(field_name='max_guests', lookup_expr='gte')
+    # The date and geographic filters depend on each other and are applied
+    # together in filter_queryset().
+    lat = django_filters.NumberFilter(method='filter_deferred')
+    lng = django_filters.NumberFilter(method='filter_deferred')
+    radius_km = django_filters.NumberFilter(method='filter_deferred')
+    bbox = django_filters.CharFilter(method='filter_deferred')
+    check_in = django_filters.DateFilter(method='filter_deferred')
+    check_out = django_filters.DateFilter(method='filter_deferred')
+
+    class Meta:
+        model = Property
+        fields = ['location', 'bedrooms', 'bathrooms']
+
+    def filter_amenities(self, queryset, name, value):
+        # ?amenities=wifi,pool matches properties offering all of them.
+        mask = mask_for_terms(term for term in value.split(',') if term.strip())
+        if mask is None:
+            return queryset.none()
+        return filter_by_mask(queryset, mask)
+
+    def filter_deferred(self, queryset, name, value):
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        queryset = self.filter_available(queryset)
+        return self.filter_location(queryset)
+
+    def filter_available(self, queryset):
+        check_in = self.form.cleaned_data.get('check_in')
+        check_out = self.form.cleaned_data.get('check_out')
+        if check_in is None and check_out is None:
+            return queryset
+        if check_in is None or check_out is None:
+            raise ValidationError({
+                'check_in' if check_in is None else 'check_out': 'check_in and check_out must be given together'
+            })
+        if check_in >= check_out:
+            raise ValidationError({'check_out': 'check_out must be after check_in'})
+        # Same overlap rule as Booking.clean(), as anti-joins.
+        conflicts = Booking.objects.filter(
+            booking_property=OuterRef('pk')
+        ).active().overlapping(check_in, check_out)
+        blocked = BlockedDateRange.objects.filter(property=OuterRef('pk')).overlapping(check_in, check_out)
+        return queryset.filter(~Exists(conflicts), ~Exists(blocked))
+
+    def filter_location(self, queryset):
+        data = self.form.cleaned_data
+        if data.get('bbox'):
+            queryset = within_bbox(queryset, *self.parse_bbox(data['bbox']))
+
+        lat, lng, radius_km = data.get('lat'), data.get('lng'), data.get('radius_km')
+        if lat is None and lng is None:
+            if radius_km is not None:
+                raise ValidationError({'radius_km': 'radius_km requires lat and lng'})
+            return queryset
+        if lat is None or lng is None:
+            raise ValidationError({'lat' if lat is None else 'lng': 'lat and lng must be given together'})
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValidationError({'lat': 'Coordinates are out of range'})
+        radius_km = DEFAULT_RADIUS_KM if radius_km is None else float(radius_km)
+        if not 0 < radius_km <= MAX_RADIUS_KM:
+            raise ValidationError({'radius_km': f'radius_km must be between 0 and {MAX_RADIUS_KM}'})
+        return within_radius(queryset, float(lat), float(lng), radius_km)
+
+    @staticmethod
+    def parse_bbox(value):
+        # ?bbox=min_lng,min_lat,max_lng,max_lat
+        try:
+            min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+        except ValueError:
+            raise ValidationError({'bbox': 'Expected bbox=min_lng,min_lat,max_lng,max_lat'})
+        if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= max_lng <= 180):
+            raise ValidationError({'bbox': 'Invalid bounding box'})
+        return min_lat, min_lng, max_lat, max_lng
+
+
+class PropertySearchFilter(filters.SearchFilter):
+    """Ranked full-text search backed by the stored property search vector."""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return search_properties(queryset, terms)
+
+
+class PropertyOrderingFilter(filters.OrderingFilter):
+    """
+    Orders radius searches by distance and text searches by relevance unless
+    the client asks for another ordering. Public ordering names are mapped to
+    their stored columns through ``ordering_aliases``.
+    """
+    ordering_aliases = {'rating': 'rating_score'}
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param):
+            annotations = queryset.query.annotations
+            if 'distance_km' in annotations:
+                return ['distance_km', *self.get_default_ordering(view)]
+            if 'search_rank' in annotations:
+                return ['-search_rank', *self.get_default_ordering(view)]
+        ordering = super().get_ordering(request, queryset, view)
+        return ordering and [self.column(term) for term in ordering]
+
+    def column(self, term):
+        descending = term.startswith('-')
+        name = self.ordering_aliases.get(term.lstrip('-'), term.lstrip('-'))
+        return f'-{name}' if descending else name
@@ -0,0 +1,103 @@
+import math
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+GEOHASH_PRECISION = 9
+# A search area is covered by at most this many geohash prefixes.
+MAX_COVER_CELLS = 16
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    latitude, longitude = float(latitude), float(longitude)
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    value = bits = 0
+    even = True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        if coordinate >= middle:
+            value = (value << 1) | 1
+            interval[0] = middle
+        else:
+            value <<= 1
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            value = bits = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell of the given length."""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def covering_cells(min_lat, min_lng, max_lat, max_lng):
+    """
+    The longest geohash prefixes that cover the box in at most MAX_COVER_CELLS
+    cells, or None when only the whole world would do.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = range(int((min_lat + 90) // height), min(int((max_lat + 90) // height), int(180 / height) - 1) + 1)
+        cols = range(int((min_lng + 180) // width), min(int((max_lng + 180) // width), int(360 / width) - 1) + 1)
+        if len(rows) * len(cols) > MAX_COVER_CELLS:
+            continue
+        return sorted({
+            encode_geohash(-90 + (row + 0.5) * height, -180 + (col + 0.5) * width, precision)
+            for row in rows for col in cols
+        })
+    return None
+
+
+def bbox_around(latitude, longitude, radius_km):
+    lat_delta = radius_km / KM_PER_DEGREE
+    lng_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return (
+        max(latitude - lat_delta, -90.0), max(longitude - lng_delta, -180.0),
+        min(latitude + lat_delta, 90.0), min(longitude + lng_delta, 180.0),
+    )
+
+
+def within_bbox(queryset, min_lat, min_lng, max_lat, max_lng):
+    """Narrow by indexed geohash prefixes first, then by the exact box."""
+    cells = covering_cells(min_lat, min_lng, max_lat, max_lng)
+    if cells is not None:
+        prefixes = Q()
+        for cell in cells:
+            prefixes |= Q(geohash__startswith=cell)
+        queryset = queryset.filter(prefixes)
+    return queryset.filter(
+        latitude__gte=min_lat, latitude__lte=max_lat,
+        longitude__gte=min_lng, longitude__lte=max_lng,
+    )
+
+
+def distance_km(latitude, longitude):
+    """Haversine distance in kilometres from a point to each property."""
+    lat = Radians(Cast('latitude', FloatField()))
+    lng = Radians(Cast('longitude', FloatField()))
+    origin_lat = math.radians(latitude)
+    origin_lng = math.radians(longitude)
+    haversine = (
+        Power(Sin((lat - Value(origin_lat)) / 2), 2)
+        + Cos(lat) * Value(math.cos(origin_lat)) * Power(Sin((lng - Value(origin_lng)) / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(haversine))
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    queryset = within_bbox(queryset, *bbox_around(latitude, longitude, radius_km))
+    return queryset.annotate(distance_km=distance_km(latitude, longitude)).filter(
+        distance_km__lte=radius_km
+    )
@@ -0,0 +1,43 @@
+import io
+from PIL import Image, ImageOps
+
+# name -> longest edge in pixels
+RENDITION_SIZES = {
+    'thumbnail': 320,
+    'card': 800,
+    'full': 1920,
+}
+# format -> (file extension, Pillow save options)
+RENDITION_FORMATS = {
+    'webp': ('webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def render_renditions(source):
+    """
+    Render every size in every format from the original image (a path or a
+    seekable binary file), returning {name: {format: (bytes, width, height)}}.
+    """
+    with Image.open(source) as original:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ('RGB', 'L'):
+            background = Image.new('RGB', original.size, 'white')
+            background.paste(original.convert('RGBA'), mask=original.convert('RGBA').getchannel('A'))
+            original = background
+        elif original.mode == 'L':
+            original = original.convert('RGB')
+
+        renditions = {}
+        # Largest first so each size is resampled from the next larger one.
+        source = original
+        for name, edge in sorted(RENDITION_SIZES.items(), key=lambda item: -item[1]):
+            image = source.copy()
+            image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            renditions[name] = {}
+            for fmt, (_, options) in RENDITION_FORMATS.items():
+                buffer = io.BytesIO()
+                image.save(buffer, **options)
+                renditions[name][fmt] = (buffer.getvalue(), image.width, image.height)
+            source = image
+        return renditions
@@ -0,0 +1,71 @@
+import csv
+from decimal import Decimal, InvalidOperation
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.properties.caching import invalidate_all_properties
+from apps.properties.geo import encode_geohash
+from apps.properties.models import Property
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Sets property coordinates from a CSV with latitude and longitude columns '
+        'keyed by property_id or location, and recomputes geohashes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='CSV file with property_id or location, latitude, longitude')
+        parser.add_argument('--rehash', action='store_true',
+                            help='Recompute the geohash of every property that has coordinates')
+
+    def handle(self, *args, **options):
+        if not options['file'] and not options['rehash']:
+            raise CommandError('Pass --file, --rehash or both')
+
+        if options['file']:
+            by_id, by_location = self.read_coordinates(options['file'])
+            changed = []
+            for prop in Property.objects.only('property_id', 'location', 'latitude', 'longitude').iterator():
+                coordinates = by_id.get(str(prop.property_id)) or by_location.get(prop.location.strip().lower())
+                if coordinates:
+                    prop.latitude, prop.longitude = coordinates
+                    prop.geohash = encode_geohash(*coordinates)
+                    changed.append(prop)
+            with transaction.atomic():
+                Property.objects.bulk_update(changed, ['latitude', 'longitude', 'geohash'], batch_size=BATCH_SIZE)
+                invalidate_all_properties()
+            self.stdout.write(self.style.SUCCESS(f'Set coordinates for {len(changed)} properties'))
+
+        if options['rehash']:
+            properties = []
+            located = Property.objects.filter(latitude__isnull=False, longitude__isnull=False)
+            for prop in located.only('property_id', 'latitude', 'longitude').iterator():
+                prop.geohash = encode_geohash(prop.latitude, prop.longitude)
+                properties.append(prop)
+            with transaction.atomic():
+                Property.objects.bulk_update(properties, ['geohash'], batch_size=BATCH_SIZE)
+            self.stdout.write(self.style.SUCCESS(f'Recomputed geohashes for {len(properties)} properties'))
+
+    def read_coordinates(self, path):
+        by_id, by_location = {}, {}
+        try:
+            with open(path, newline='') as handle:
+                for line, row in enumerate(csv.DictReader(handle), start=2):
+                    try:
+                        latitude = Decimal(row['latitude']).quantize(Decimal('0.000001'))
+                        longitude = Decimal(row['longitude']).quantize(Decimal('0.000001'))
+                    except (KeyError, TypeError, InvalidOperation):
+                        raise CommandError(f'{path}:{line}: missing or invalid coordinates')
+                    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                        raise CommandError(f'{path}:{line}: coordinates out of range')
+                    if row.get('property_id'):
+                        by_id[row['property_id'].strip()] = (latitude, longitude)
+                    elif row.get('location'):
+                        by_location[row['location'].strip().lower()] = (latitude, longitude)
+                    else:
+                        raise CommandError(f'{path}:{line}: needs a property_id or location')
+        except OSError as exc:
+            raise CommandError(str(exc))
+        return by_id, by_location
@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.properties.similarity import DEFAULT_NEIGHBOURS, build_similar_properties
+
+
+class Command(BaseCommand):
+    help = (
+        'Precomputes the nearest neighbours of every active property for the similar '
+        'listings endpoint, refreshing only lists affected by changes since the last run'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--neighbours', type=int, default=DEFAULT_NEIGHBOURS,
+                            help='Neighbours stored per property')
+        parser.add_argument('--full', action='store_true', help='Recompute every list')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Properties whose lists are written per transaction')
+
+    def handle(self, *args, **options):
+        if options['neighbours'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--neighbours and --batch-size must be positive')
+        started = time.monotonic()
+        written = build_similar_properties(
+            k=options['neighbours'], full=options['full'], batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Refreshed similar properties for {written} properties in {time.monotonic() - started:.1f}s'
+        ))
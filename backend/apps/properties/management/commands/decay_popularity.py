@@ -0,0 +1,45 @@
+from collections import defaultdict
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from apps.bookings.models import Booking
+from apps.properties.caching import invalidate_all_properties
+from apps.properties.models import Property
+from apps.properties.ranking import BOOKING_WINDOW, booking_weight, popularity_expression
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes the booking heat of every property from its recent confirmed '
+        'bookings, decayed by age, and the popularity ranking built on it'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Properties updated per statement')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        now = timezone.now()
+        heat = defaultdict(float)
+        recent = Booking.objects.filter(
+            status='confirmed', created_at__gt=now - BOOKING_WINDOW
+        ).values_list('booking_property_id', 'created_at')
+        for property_id, created_at in recent.iterator(chunk_size=5000):
+            heat[property_id] += booking_weight(created_at, now)
+
+        items = list(heat.items())
+        with transaction.atomic():
+            Property.objects.filter(booking_heat__gt=0).update(booking_heat=0.0)
+            for start in range(0, len(items), options['batch_size']):
+                Property.objects.bulk_update(
+                    [Property(property_id=pk, booking_heat=value) for pk, value in items[start:start + options['batch_size']]],
+                    ['booking_heat'],
+                )
+            updated = Property.objects.update(popularity=popularity_expression())
+        invalidate_all_properties()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed popularity for {updated} properties, {len(items)} with recent bookings'
+        ))
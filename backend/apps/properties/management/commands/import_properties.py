@@ -0,0 +1,177 @@
+import csv
+import json
+import sys
+import time
+import uuid
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import Lower
+from apps.properties.caching import invalidate_all_properties
+from apps.properties.models import Property
+from apps.properties.search import update_search_vector
+from apps.users.models import User
+
+# Feed rows without a property_id get one derived from these columns, so
+# re-importing the same feed updates the listings instead of duplicating them.
+IMPORT_NAMESPACE = uuid.UUID('6f1c1d4e-8a4b-4c55-9a51-3d0f5b6c2e71')
+IMPORT_FIELDS = (
+    'name', 'description', 'location', 'latitude', 'longitude', 'pricepernight',
+    'bedrooms', 'bathrooms', 'max_guests', 'amenities', 'is_active',
+)
+BOOLEAN_VALUES = {'true': True, '1': True, 'yes': True, 'false': False, '0': False, 'no': False}
+
+
+class RowError(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports properties from a CSV or JSONL feed in batches, upserting on '
+        'property_id and resolving hosts by host_email'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file, or '-' for stdin")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help='Input format; inferred from the file extension by default')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--rejects', help='Write rejected rows with their errors to this JSONL file')
+
+    def handle(self, *args, **options):
+        input_format = options['format'] or ('jsonl' if options['path'].endswith(('.jsonl', '.ndjson')) else 'csv')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        self.hosts = {}
+        self.rejects = open(options['rejects'], 'w') if options['rejects'] else None
+        self.imported = self.rejected = 0
+        started = time.monotonic()
+        try:
+            handle = sys.stdin if options['path'] == '-' else open(options['path'], newline='')
+        except OSError as exc:
+            raise CommandError(str(exc))
+        try:
+            batch = []
+            for line, row in self.read_rows(handle, input_format):
+                batch.append((line, row))
+                if len(batch) >= options['batch_size']:
+                    self.import_batch(batch)
+                    batch = []
+            if batch:
+                self.import_batch(batch)
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+            if self.rejects:
+                self.rejects.close()
+        invalidate_all_properties()
+
+        elapsed = time.monotonic() - started
+        rate = self.imported / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} properties in {elapsed:.1f}s ({rate:.0f} rows/s), '
+            f'rejected {self.rejected}'
+        ))
+
+    def read_rows(self, handle, input_format):
+        if input_format == 'csv':
+            yield from enumerate(csv.DictReader(handle), start=2)
+            return
+        for line, text in enumerate(handle, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as exc:
+                self.reject(line, {'raw': text.rstrip('\n')}, f'Invalid JSON: {exc}')
+                continue
+            if not isinstance(row, dict):
+                self.reject(line, {'raw': text.rstrip('\n')}, 'Expected a JSON object')
+                continue
+            yield line, row
+
+    def import_batch(self, batch):
+        self.resolve_hosts({str(row.get('host_email') or '').strip().lower() for _, row in batch})
+
+        properties = {}
+        for line, row in batch:
+            try:
+                prop = self.build_property(row)
+            except RowError as exc:
+                self.reject(line, row, str(exc))
+                continue
+            # The last occurrence of a listing in a batch wins.
+            properties[prop.property_id] = (line, row, prop)
+
+        # A feed may only update listings that already belong to the row's host.
+        owners = dict(Property.objects.filter(pk__in=properties).values_list('property_id', 'host_id'))
+        for property_id, (line, row, prop) in list(properties.items()):
+            if owners.get(property_id, prop.host_id) != prop.host_id:
+                self.reject(line, row, 'property_id belongs to another host')
+                del properties[property_id]
+        if not properties:
+            return
+
+        with transaction.atomic():
+            Property.objects.bulk_create(
+                [prop for _, _, prop in properties.values()],
+                update_conflicts=True,
+                unique_fields=['property_id'],
+                update_fields=['host', *IMPORT_FIELDS, 'amenity_mask', 'geohash', 'updated_at'],
+            )
+            update_search_vector(Property.objects.filter(pk__in=properties))
+        self.imported += len(properties)
+
+    def resolve_hosts(self, emails):
+        missing = [email for email in emails if email and email not in self.hosts]
+        if missing:
+            found = dict(
+                User.objects.annotate(email_lower=Lower('email'))
+                .filter(email_lower__in=missing).values_list('email_lower', 'user_id')
+            )
+            for email in missing:
+                self.hosts[email] = found.get(email)
+
+    def build_property(self, row):
+        email = str(row.get('host_email') or '').strip().lower()
+        host_id = self.hosts.get(email)
+        if host_id is None:
+            raise RowError(f'Unknown host_email {email!r}' if email else 'host_email is required')
+
+        values = {}
+        errors = []
+        for name in IMPORT_FIELDS:
+            field = Property._meta.get_field(name)
+            raw = row.get(name)
+            if isinstance(raw, str):
+                raw = raw.strip()
+            if raw in (None, ''):
+                if field.has_default():
+                    continue
+                raw = None if field.null else ''
+            elif name == 'is_active' and isinstance(raw, str):
+                raw = BOOLEAN_VALUES.get(raw.lower(), raw)
+            try:
+                values[name] = field.clean(raw, None)
+            except ValidationError as exc:
+                errors.append(f"{name}: {' '.join(exc.messages)}")
+        if errors:
+            raise RowError('; '.join(errors))
+
+        try:
+            property_id = uuid.UUID(str(row['property_id'])) if row.get('property_id') else uuid.uuid5(
+                IMPORT_NAMESPACE, f"{email}|{values['name']}|{values['location']}"
+            )
+        except ValueError:
+            raise RowError('property_id is not a valid UUID')
+
+        prop = Property(property_id=property_id, host_id=host_id, **values)
+        prop.compute_fields()
+        return prop
+
+    def reject(self, line, row, error):
+        self.rejected += 1
+        if self.rejects:
+            self.rejects.write(json.dumps({'line': line, 'error': error, 'row': row}, default=str) + '\n')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from apps.properties.models import PropertyImage
+from apps.properties.renditions import shutdown, submit_renditions
+
+
+class Command(BaseCommand):
+    help = 'Renders missing property image renditions in the worker pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-render images that already have renditions')
+
+    def handle(self, *args, **options):
+        images = PropertyImage.objects.all() if options['all'] else PropertyImage.objects.filter(renditions={})
+        image_ids = list(images.values_list('pk', flat=True))
+        for image_id in image_ids:
+            submit_renditions(image_id)
+        shutdown()
+
+        failed = PropertyImage.objects.filter(pk__in=image_ids, renditions={}).count()
+        self.stdout.write(self.style.SUCCESS(f'Rendered {len(image_ids) - failed} images, {failed} failed'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.properties.models import ImageUpload
+from apps.properties.uploads import UPLOAD_TTL, discard_upload
+
+
+class Command(BaseCommand):
+    help = 'Deletes chunked image uploads that have been idle longer than the upload TTL'
+
+    def handle(self, *args, **kwargs):
+        stale = ImageUpload.objects.filter(updated_at__lt=timezone.now() - UPLOAD_TTL)
+        count = 0
+        for upload in stale.iterator():
+            discard_upload(upload)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Purged {count} stale uploads'))
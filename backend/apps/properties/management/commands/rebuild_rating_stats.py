@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+from apps.properties.caching import invalidate_all_properties
+from apps.properties.models import Property
+from apps.properties.ranking import popularity_expression, rating_score_expression
+from apps.reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the stored rating aggregates of every property from its reviews'
+
+    def handle(self, *args, **kwargs):
+        reviews = Review.objects.filter(
+            review_property=OuterRef('pk')
+        ).order_by().values('review_property')
+
+        with transaction.atomic():
+            updated = Property.objects.update(
+                rating_sum=Coalesce(
+                    Subquery(reviews.annotate(total=Sum('rating')).values('total')),
+                    Value(0), output_field=IntegerField()
+                ),
+                review_count=Coalesce(
+                    Subquery(reviews.annotate(total=Count('pk')).values('total')),
+                    Value(0), output_field=IntegerField()
+                ),
+            )
+            Property.objects.update(
+                average_rating=Case(
+                    When(review_count__gt=0,
+                         then=Cast('rating_sum', FloatField()) / F('review_count')),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                ),
+                rating_score=rating_score_expression(),
+                popularity=popularity_expression(score=rating_score_expression()),
+            )
+            invalidate_all_properties()
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating aggregates for {updated} properties'))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:59
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Property = apps.get_model('properties', 'Property')
+    Review = apps.get_model('reviews', 'Review')
+    stats = Review.objects.order_by().values('review_property').annotate(
+        total=Sum('rating'), count=Count('pk')
+    )
+    for row in stats:
+        Property.objects.filter(pk=row['review_property']).update(
+            rating_sum=row['total'],
+            review_count=row['count'],
+            average_rating=row['total'] / row['count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0002_initial'),
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='average_rating',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:01
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Property = apps.get_model('properties', 'Property')
+    Property.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='english')
+        + SearchVector('location', weight='B', config='english')
+        + SearchVector('description', weight='C', config='english')
+        + SearchVector('amenities', weight='D', config='english')
+    ))
+    schema_editor.execute(
+        'CREATE INDEX properties_search_vector_gin ON properties USING gin (search_vector)'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS properties_search_vector_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:02
+
+from django.db import migrations, models
+from apps.properties.amenities import amenity_mask
+
+
+def parse_amenities(apps, schema_editor):
+    Property = apps.get_model('properties', 'Property')
+    for property_id, amenities in Property.objects.values_list('property_id', 'amenities').iterator():
+        Property.objects.filter(pk=property_id).update(amenity_mask=amenity_mask(amenities))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0004_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='amenity_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(parse_amenities, migrations.RunPython.noop),
+    ]
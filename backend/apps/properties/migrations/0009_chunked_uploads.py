@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:14
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+def record_file_sizes(apps, schema_editor):
+    PropertyImage = apps.get_model('properties', 'PropertyImage')
+    for image in PropertyImage.objects.exclude(image='').iterator():
+        try:
+            size = image.image.size
+        except (OSError, ValueError):
+            # Missing files count as empty rather than blocking the migration.
+            continue
+        PropertyImage.objects.filter(pk=image.pk).update(file_size=size)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0008_image_renditions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyimage',
+            name='file_size',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(record_file_sizes, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ImageUpload',
+            fields=[
+                ('upload_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField()),
+                ('offset', models.PositiveBigIntegerField(default=0)),
+                ('checksum', models.CharField(blank=True, max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to='properties.property')),
+                ('uploader', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'property_image_uploads',
+            },
+        ),
+    ]
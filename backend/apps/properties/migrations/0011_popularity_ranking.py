@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:40
+
+from django.conf import settings
+from django.db import migrations, models
+from apps.properties.ranking import rating_score_expression
+
+
+def backfill_rating_score(apps, schema_editor):
+    # Booking heat starts at zero; the decay_popularity command fills it in.
+    Property = apps.get_model('properties', 'Property')
+    Property.objects.update(rating_score=rating_score_expression())
+    Property.objects.update(popularity=models.F('rating_score'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0010_similar_properties'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='booking_heat',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='popularity',
+            field=models.FloatField(default=4.0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='rating_score',
+            field=models.FloatField(default=4.0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['rating_score', 'property_id'], name='properties_rating__9180a7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['popularity', 'property_id'], name='properties_popular_b58eca_idx'),
+        ),
+        migrations.RunPython(backfill_rating_score, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:47
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0011_popularity_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockedDateRange',
+            fields=[
+                ('block_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('reason', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocked_ranges', to='properties.property')),
+            ],
+            options={
+                'db_table': 'property_blocked_dates',
+                'indexes': [models.Index(fields=['property', 'start_date', 'end_date'], name='property_bl_propert_150359_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+# Set bit positions of an amenity mask, so "offers all of these" becomes an
+# array containment test a GIN index can answer.
+CREATE_FUNCTION = '''
+CREATE OR REPLACE FUNCTION amenity_bits(mask bigint) RETURNS integer[]
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+    SELECT coalesce(array_agg(bit ORDER BY bit), '{}')
+    FROM generate_series(0, 62) AS bit
+    WHERE mask & (1::bigint << bit) <> 0
+$$
+'''
+
+
+def create_amenity_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(CREATE_FUNCTION)
+    schema_editor.execute(
+        'CREATE INDEX properties_amenity_bits_gin ON properties USING gin (amenity_bits(amenity_mask))'
+    )
+
+
+def drop_amenity_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS properties_amenity_bits_gin')
+        schema_editor.execute('DROP FUNCTION IF EXISTS amenity_bits(bigint)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0012_blocked_date_ranges'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_amenity_index, drop_amenity_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0014_image_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageupload',
+            name='parts',
+            field=models.JSONField(default=list, editable=False),
+        ),
+    ]
@@ -1,7 +1,29 @@
 import uuid
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
-from django.core.validators import MinValueValidator
+from django.db.models import Case, F, FloatField, Prefetch, Value, When
+from django.db.models.functions import Cast
+from django.core.validators import MaxValueValidator, MinValueValidator
 from apps.users.models import User
+from .amenities import amenity_mask
+from .caching import invalidate_calendar, invalidate_property
+from .geo import encode_geohash
+from .ranking import PRIOR_RATING, popularity_expression, rating_score_expression
+from .renditions import schedule_renditions
+from .search import SEARCH_FIELDS, update_search_vector
+
+
+# The first image in this order is a property's card image.
+PREVIEW_IMAGE_ORDERING = ('-is_primary', '-created_at')
+
+
+def preview_images_prefetch(lookup='images'):
+    """Prefetch only the card image of each property into ``preview_images``."""
+    return Prefetch(
+        lookup,
+        queryset=PropertyImage.objects.order_by(*PREVIEW_IMAGE_ORDERING)[:1],
+        to_attr='preview_images',
+    )
 
 
 class Property(models.Model):
@@ -10,6 +32,15 @@ class Property(models.Model):
     name = models.CharField(max_length=150)
     description = models.TextField()
     location = models.CharField(max_length=255)
+    latitude = models.DecimalField(
+        max_digits=9, decimal_places=6, null=True, blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitude = models.DecimalField(
+        max_digits=9, decimal_places=6, null=True, blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
     pricepernight = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -19,10 +50,28 @@ class Property(models.Model):
     bathrooms = models.PositiveIntegerField(default=1)
     max_guests = models.PositiveIntegerField(default=1)
     amenities = models.TextField(blank=True, help_text="Comma-separated list of amenities")
+    amenity_mask = models.BigIntegerField(default=0, editable=False)
     is_active = models.BooleanField(default=True)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    average_rating = models.FloatField(default=0, editable=False)
+    # Ranking columns behind ?ordering=rating and ?ordering=popularity, see ranking.py.
+    rating_score = models.FloatField(default=PRIOR_RATING, editable=False)
+    booking_heat = models.FloatField(default=0, editable=False)
+    popularity = models.FloatField(default=PRIOR_RATING, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Columns maintained with targeted UPDATEs; a full save() must never
+    # write back the (possibly stale) values held by the instance.
+    DERIVED_FIELDS = (
+        'rating_sum', 'review_count', 'average_rating', 'search_vector',
+        'rating_score', 'booking_heat', 'popularity',
+    )
+    # Columns recomputed from their source fields on every save.
+    COMPUTED_FROM = {'amenity_mask': ('amenities',), 'geohash': ('latitude', 'longitude')}
+
     class Meta:
         db_table = 'properties'
         verbose_name_plural = 'Properties'
@@ -30,17 +79,76 @@ class Property(models.Model):
             models.Index(fields=['host']),
             models.Index(fields=['location']),
             models.Index(fields=['pricepernight']),
+            # Keyset pagination seeks on (ordering column, primary key).
+            models.Index(fields=['created_at', 'property_id']),
+            models.Index(fields=['pricepernight', 'property_id']),
+            models.Index(fields=['rating_score', 'property_id']),
+            models.Index(fields=['popularity', 'property_id']),
         ]
+        # The GIN index on search_vector is PostgreSQL-only and is created in
+        # migration 0004_search_vector.
 
     def __str__(self):
         return f"{self.name} - {self.location}"
 
-    @property
-    def average_rating(self):
-        reviews = self.reviews.all()
-        if reviews.exists():
-            return sum(review.rating for review in reviews) / reviews.count()
-        return 0
+    def compute_fields(self):
+        """Derive the columns in COMPUTED_FROM from their source fields."""
+        self.amenity_mask = amenity_mask(self.amenities)
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        self.compute_fields()
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            kwargs['update_fields'] = update_fields.union(
+                computed for computed, sources in self.COMPUTED_FROM.items()
+                if not update_fields.isdisjoint(sources)
+            )
+        elif not self._state.adding:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        if update_fields is None or SEARCH_FIELDS.intersection(update_fields):
+            update_search_vector(Property.objects.filter(pk=self.pk))
+        invalidate_property(self.pk)
+
+    def delete(self, *args, **kwargs):
+        invalidate_property(self.pk)
+        return super().delete(*args, **kwargs)
+
+    @classmethod
+    def apply_rating_change(cls, property_id, rating_delta, count_delta):
+        """Shift the stored rating aggregates of one property in a single UPDATE."""
+        rating_sum = F('rating_sum') + rating_delta
+        review_count = F('review_count') + count_delta
+        cls.objects.filter(property_id=property_id).update(
+            rating_sum=rating_sum,
+            review_count=review_count,
+            average_rating=Case(
+                When(review_count__gt=-count_delta,
+                     then=Cast(rating_sum, FloatField()) / review_count),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+            rating_score=rating_score_expression(rating_sum, review_count),
+            popularity=popularity_expression(score=rating_score_expression(rating_sum, review_count)),
+        )
+        invalidate_property(property_id)
+
+    @classmethod
+    def set_booking_heat(cls, property_id, booking_heat):
+        """Store a property's recomputed booking heat and the popularity built on it."""
+        cls.objects.filter(property_id=property_id).update(
+            booking_heat=booking_heat,
+            popularity=popularity_expression(booking_heat=Value(booking_heat)),
+        )
+        invalidate_property(property_id)
 
 
 class PropertyImage(models.Model):
@@ -48,7 +156,13 @@ class PropertyImage(models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='properties/')
     is_primary = models.BooleanField(default=False)
+    # {name: {'webp': path, 'jpeg': path, 'width': ..., 'height': ...}} for each
+    # size in imaging.RENDITION_SIZES; empty until the worker pool renders them.
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
+    # Bytes of the original, counted against IMAGE_UPLOAD_PROPERTY_MAX_BYTES.
+    file_size = models.PositiveBigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'property_images'
@@ -56,3 +170,92 @@ class PropertyImage(models.Model):
 
     def __str__(self):
         return f"Image for {self.property.name}"
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding and self.image:
+            self.file_size = self.image.size
+        super().save(*args, **kwargs)
+        if adding:
+            schedule_renditions(self)
+        invalidate_property(self.property_id)
+
+    def delete(self, *args, **kwargs):
+        invalidate_property(self.property_id)
+        return super().delete(*args, **kwargs)
+
+
+class ImageUpload(models.Model):
+    """A resumable chunked upload that becomes a PropertyImage once complete."""
+    upload_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='image_uploads')
+    uploader = models.ForeignKey(User, on_delete=models.CASCADE, related_name='image_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    # Hash chain over the received chunks, see uploads.chain_checksum().
+    checksum = models.CharField(max_length=64, blank=True)
+    # Storage names of the received chunks in offset order, see uploads.part_name().
+    parts = models.JSONField(default=list, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'property_image_uploads'
+
+    def __str__(self):
+        return f"Upload {self.upload_id} of {self.filename}"
+
+
+class SimilarProperty(models.Model):
+    """One of a property's nearest neighbours, written by build_similar_properties."""
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='similar_properties')
+    similar = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='neighbour_of')
+    # 1 is the most similar.
+    rank = models.PositiveSmallIntegerField()
+    # Distance in the similarity.py feature space.
+    distance = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'property_similarities'
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'rank'], name='property_similarities_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.similar_id} is #{self.rank} for {self.property_id}"
+
+
+class BlockedDateRangeQuerySet(models.QuerySet):
+    def overlapping(self, start_date, end_date):
+        return self.filter(start_date__lte=end_date, end_date__gte=start_date)
+
+
+class BlockedDateRange(models.Model):
+    """Dates a host has taken off the calendar, inclusive at both ends like a booking."""
+    block_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='blocked_ranges')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    reason = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = BlockedDateRangeQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'property_blocked_dates'
+        indexes = [
+            models.Index(fields=['property', 'start_date', 'end_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.property_id} blocked {self.start_date} - {self.end_date}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_calendar(self.property_id)
+
+    def delete(self, *args, **kwargs):
+        invalidate_calendar(self.property_id)
+        return super().delete(*args, **kwargs)
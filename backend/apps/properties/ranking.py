@@ -0,0 +1,34 @@
+from datetime import timedelta
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast, Greatest, Ln
+
+# Ratings are averaged as if every property also had PRIOR_REVIEWS reviews of
+# PRIOR_RATING, so a single five-star review does not outrank a long record.
+PRIOR_RATING = 4.0
+PRIOR_REVIEWS = 5
+# A property's booking heat sums its confirmed bookings, each weighing one
+# when made and halving every BOOKING_HALF_LIFE after its created_at; bookings
+# older than BOOKING_WINDOW no longer count.
+BOOKING_HALF_LIFE = timedelta(days=30)
+BOOKING_WINDOW = timedelta(days=180)
+# Popularity is the rating score plus this much per e-fold of booking heat.
+BOOKING_WEIGHT = 1.0
+
+
+def rating_score_expression(rating_sum=F('rating_sum'), review_count=F('review_count')):
+    return (
+        (Value(PRIOR_RATING * PRIOR_REVIEWS) + Cast(rating_sum, FloatField()))
+        / (Value(float(PRIOR_REVIEWS)) + Cast(review_count, FloatField()))
+    )
+
+
+def popularity_expression(score=F('rating_score'), booking_heat=F('booking_heat')):
+    return score + Value(BOOKING_WEIGHT) * Ln(Value(1.0) + Greatest(booking_heat, Value(0.0)))
+
+
+def booking_weight(created_at, now):
+    """Heat one confirmed booking made at ``created_at`` still contributes at ``now``."""
+    age = max(now - created_at, timedelta(0))
+    if age > BOOKING_WINDOW:
+        return 0.0
+    return 0.5 ** (age / BOOKING_HALF_LIFE)
@@ -0,0 +1,127 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from .caching import invalidate_property
+from .imaging import RENDITION_FORMATS, render_renditions
+
+logger = logging.getLogger(__name__)
+
+RENDITION_DIR = 'properties/renditions'
+
+_executor = None
+_store_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(replace_broken=False):
+    global _executor
+    with _executor_lock:
+        if _executor is None or replace_broken:
+            # spawn: forked copies of a threaded web worker can deadlock.
+            # Workers inherit DJANGO_SETTINGS_MODULE and set Django up for storage access.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_RENDITION_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        return _executor
+
+
+def get_store_executor():
+    global _store_executor
+    with _executor_lock:
+        if _store_executor is None:
+            # Rendered images are recorded from this thread rather than from
+            # the process pool's internal result thread.
+            _store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='renditions')
+        return _store_executor
+
+
+def shutdown():
+    """Wait until every submitted image has been rendered and recorded."""
+    global _executor, _store_executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+    with _executor_lock:
+        store_executor, _store_executor = _store_executor, None
+    if store_executor is not None:
+        store_executor.shutdown(wait=True)
+
+
+def schedule_renditions(image):
+    """Render the image's renditions in the worker pool once its upload commits."""
+    transaction.on_commit(partial(submit_renditions, image.pk), robust=True)
+
+
+def submit_renditions(image_id):
+    PropertyImage = apps.get_model('properties', 'PropertyImage')
+    image = PropertyImage.objects.filter(pk=image_id).only('pk', 'property_id', 'image').first()
+    if image is None:
+        return None
+    # Only the storage name crosses to the worker, which reads the original itself.
+    try:
+        future = get_executor().submit(render_stored_image, image.pk, image.image.name)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM on a huge upload); start a fresh pool.
+        future = get_executor(replace_broken=True).submit(render_stored_image, image.pk, image.image.name)
+    future.add_done_callback(partial(_queue_store, image.pk, image.property_id))
+    return future
+
+
+def render_stored_image(image_id, name):
+    """
+    Runs in a worker process: render the stored original ``name`` and save the
+    renditions to storage, returning {size: {format: path, 'width', 'height'}}.
+    """
+    with default_storage.open(name, 'rb') as original:
+        rendered = render_renditions(original)
+    renditions = {}
+    for size, formats in rendered.items():
+        renditions[size] = {}
+        for fmt, (content, width, height) in formats.items():
+            path = f'{RENDITION_DIR}/{image_id}/{size}.{RENDITION_FORMATS[fmt][0]}'
+            default_storage.delete(path)
+            renditions[size][fmt] = default_storage.save(path, ContentFile(content))
+            renditions[size]['width'], renditions[size]['height'] = width, height
+    return renditions
+
+
+def _queue_store(image_id, property_id, future):
+    get_store_executor().submit(_store_renditions, image_id, property_id, future)
+
+
+def _store_renditions(image_id, property_id, future):
+    PropertyImage = apps.get_model('properties', 'PropertyImage')
+    try:
+        # update() skips auto_now, and the detail's ETag follows updated_at.
+        PropertyImage.objects.filter(pk=image_id).update(
+            renditions=future.result(), updated_at=timezone.now()
+        )
+        invalidate_property(property_id)
+    except Exception:
+        logger.exception('Rendering renditions for image %s failed', image_id)
+    finally:
+        close_old_connections()
+
+
+def rendition_url(image, name, fmt='webp'):
+    """Storage URL of a rendition, or of the original until it has been rendered."""
+    return stored_rendition_url(image.image.name, image.renditions, name, fmt)
+
+
+def stored_rendition_url(original, renditions, name, fmt='webp'):
+    """``rendition_url()`` from the stored image name and renditions columns."""
+    path = (renditions or {}).get(name, {}).get(fmt)
+    return default_storage.url(path or original)
@@ -0,0 +1,122 @@
+import re
+import threading
+from collections import defaultdict
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import Case, Count, F, FloatField, Max, Value, When
+
+SEARCH_CONFIG = 'english'
+
+# PostgreSQL weight classes, strongest first: name > location > description > amenities.
+SEARCH_WEIGHTS = (
+    ('name', 'A'),
+    ('location', 'B'),
+    ('description', 'C'),
+    ('amenities', 'D'),
+)
+SEARCH_FIELDS = frozenset(field for field, _ in SEARCH_WEIGHTS)
+
+# Same defaults ts_rank applies to the A/B/C/D classes.
+WEIGHT_SCORES = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+TOKEN_RE = re.compile(r'\w+')
+# Most matches the in-process index ranks and returns for one search.
+MAX_RANKED_MATCHES = 1000
+
+
+def has_full_text_search(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def property_search_vector():
+    vector = None
+    for field, weight in SEARCH_WEIGHTS:
+        part = SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def update_search_vector(queryset):
+    """Recompute the stored search vector of the given properties (PostgreSQL only)."""
+    if has_full_text_search(queryset):
+        queryset.update(search_vector=property_search_vector())
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class InProcessSearchIndex:
+    """
+    Weighted token index used where the database has no full-text search
+    (SQLite in development and tests). It is rebuilt whenever the row count
+    or the newest updated_at of the properties table changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature = None
+        self._postings = {}
+
+    def _build(self, model):
+        postings = defaultdict(dict)
+        fields = [field for field, _ in SEARCH_WEIGHTS]
+        rows = model._default_manager.values_list('pk', *fields)
+        for pk, *texts in rows.iterator():
+            for (_, weight), text in zip(SEARCH_WEIGHTS, texts):
+                for token in tokenize(text):
+                    scores = postings[token]
+                    scores[pk] = scores.get(pk, 0.0) + WEIGHT_SCORES[weight]
+        return dict(postings)
+
+    def _get_postings(self, model):
+        signature = tuple(model._default_manager.aggregate(
+            count=Count('pk'), changed=Max('updated_at')
+        ).values())
+        with self._lock:
+            if signature != self._signature:
+                self._postings = self._build(model)
+                self._signature = signature
+            return self._postings
+
+    def search(self, queryset, terms):
+        tokens = [token for term in terms for token in tokenize(term)]
+        if not tokens:
+            return queryset
+        postings = self._get_postings(queryset.model)
+
+        scores = dict(postings.get(tokens[0], {}))
+        for token in tokens[1:]:
+            matches = postings.get(token, {})
+            scores = {pk: score + matches[pk] for pk, score in scores.items() if pk in matches}
+        if not scores:
+            return queryset.none()
+
+        # Keep the query size bounded on broad searches: only the best
+        # MAX_RANKED_MATCHES are returned, and rows sharing a score share one
+        # CASE branch (scores are sums of a few weights, so there are few).
+        best = sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))[:MAX_RANKED_MATCHES]
+        by_score = defaultdict(list)
+        for pk, score in best:
+            by_score[score].append(pk)
+        return queryset.filter(pk__in=[pk for pk, _ in best]).annotate(
+            search_rank=Case(
+                *[When(pk__in=pks, then=Value(score)) for score, pks in by_score.items()],
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+
+
+fallback_index = InProcessSearchIndex()
+
+
+def search_properties(queryset, terms):
+    """Filter to properties matching every term and annotate them with ``search_rank``."""
+    if not has_full_text_search(queryset):
+        return fallback_index.search(queryset, terms)
+
+    query = SearchQuery(' '.join(terms), config=SEARCH_CONFIG)
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+    )
@@ -1,82 +1,120 @@
+from django.db.models import OuterRef, Subquery
 from rest_framework import serializers
-from .models import Property, PropertyImage
+from airbnb_project.serializers import SparseFieldsMixin
+from .amenities import amenity_codes
+from .models import (
+    PREVIEW_IMAGE_ORDERING, BlockedDateRange, ImageUpload, Property, PropertyImage, preview_images_prefetch,
+)
+from .renditions import rendition_url, stored_rendition_url
 from apps.users.serializers import UserSerializer
 
 
+# Unique placeholder images based on property name, for properties without images.
+PLACEHOLDER_IMAGES = {
+    # Beach/Coastal Properties
+    "Luxury Beach Villa": "https://images.unsplash.com/photo-1613490493576-7fde63acd811?w=1200&q=80",
+    "Charming Cottage by the Sea": "https://images.unsplash.com/photo-1600585154340-be6161a56a0c?w=1200&q=80",
+    "Tropical Island Bungalow": "https://images.unsplash.com/photo-1559827260-dc66d52bef19?w=1200&q=80",
+    "Boho Beachfront Cottage": "https://images.unsplash.com/photo-1499793983690-e29da59ef1c2?w=1200&q=80",
+
+    # Mountain/Cabin Properties
+    "Cozy Mountain Cabin": "https://images.unsplash.com/photo-1587061949409-02df41d5e562?w=1200&q=80",
+    "Ski-In Ski-Out Chalet": "https://images.unsplash.com/photo-1502784444187-359ac186c5bb?w=1200&q=80",
+    "Cozy A-Frame Cabin": "https://images.unsplash.com/photo-1542718610-a1d656d1884c?w=1200&q=80",
+    "Rustic Log Cabin": "https://images.unsplash.com/photo-1449158743715-0a90ebb6d2d8?w=1200&q=80",
+    "Mountain View Glamping Dome": "https://images.unsplash.com/photo-1504280390367-361c6d9f38f4?w=1200&q=80",
+
+    # Urban/City Properties
+    "Downtown Studio Apartment": "https://images.unsplash.com/photo-1522771739844-6a9f6d5f14af?w=1200&q=80",
+    "Modern Loft in Arts District": "https://images.unsplash.com/photo-1536376072261-38c75010e6c9?w=1200&q=80",
+    "Historic Townhouse": "https://images.unsplash.com/photo-1523217582562-09d0def993a6?w=1200&q=80",
+    "Urban Warehouse Loft": "https://images.unsplash.com/photo-1502672260266-1c1ef2d93688?w=1200&q=80",
+    "Oceanview Penthouse": "https://images.unsplash.com/photo-1545324418-cc1a3fa10c00?w=1200&q=80",
+    "Bayfront Condo": "https://images.unsplash.com/photo-1512917774080-9991f1c4c750?w=1200&q=80",
+    "Artist Live-Work Loft": "https://images.unsplash.com/photo-1484154218962-a197022b5858?w=1200&q=80",
+    "Minimalist Japanese Studio": "https://images.unsplash.com/photo-1540518614846-7eded433c457?w=1200&q=80",
+    "Smart Home Apartment": "https://images.unsplash.com/photo-1560448204-e02f11c3d0e2?w=1200&q=80",
+    "Converted Church Loft": "https://images.unsplash.com/photo-1513694203232-719a280e022f?w=1200&q=80",
+
+    # House/Family Properties
+    "Spacious Family House": "https://images.unsplash.com/photo-1570129477492-45c003edd2be?w=1200&q=80",
+    "Ranch Style Farmhouse": "https://images.unsplash.com/photo-1560185127-6a7e5a0f0e12?w=1200&q=80",
+    "Southern Plantation Home": "https://images.unsplash.com/photo-1564013799919-ab600027ffc6?w=1200&q=80",
+    "Gothic Victorian Mansion": "https://images.unsplash.com/photo-1600566753086-00f18fb6b3ea?w=1200&q=80",
+
+    # Countryside/Rural Properties
+    "Romantic Countryside Cottage": "https://images.unsplash.com/photo-1518780664697-55e3ad937233?w=1200&q=80",
+    "Charming Garden Bungalow": "https://images.unsplash.com/photo-1600596542815-ffad4c1539a9?w=1200&q=80",
+    "Wine Country Estate": "https://images.unsplash.com/photo-1580587771525-78b9dba3b914?w=1200&q=80",
+    "River House Retreat": "https://images.unsplash.com/photo-1505916349660-8d91a99c3e23?w=1200&q=80",
+    "Treehouse Hideaway": "https://images.unsplash.com/photo-1587061949409-02df41d5e562?w=1200&q=80",
+
+    # Lake/Water Properties
+    "Lakefront Paradise": "https://images.unsplash.com/photo-1499696010180-025ef6e1a8f9?w=1200&q=80",
+    "Cliffside Mediterranean Villa": "https://images.unsplash.com/photo-1613977257363-707ba9348227?w=1200&q=80",
+
+    # Desert/Southwest Properties
+    "Desert Oasis Retreat": "https://images.unsplash.com/photo-1600607687939-ce8a6c25118c?w=1200&q=80",
+}
+DEFAULT_PLACEHOLDER_IMAGE = "https://images.unsplash.com/photo-1568605114967-8130f3a36994?w=1200&q=80"
+
+
+def placeholder_image(name):
+    return PLACEHOLDER_IMAGES.get(name, DEFAULT_PLACEHOLDER_IMAGE)
+
+
 class PropertyImageSerializer(serializers.ModelSerializer):
+    renditions = serializers.SerializerMethodField()
+
     class Meta:
         model = PropertyImage
-        fields = ['image_id', 'image', 'is_primary', 'created_at']
+        fields = ['image_id', 'image', 'renditions', 'is_primary', 'created_at']
         read_only_fields = ['image_id', 'created_at']
 
+    def get_renditions(self, obj):
+        # Empty until the worker pool has rendered them; clients fall back to image.
+        return {
+            name: {
+                key: value if key in ('width', 'height') else rendition_url(obj, name, key)
+                for key, value in rendition.items()
+            }
+            for name, rendition in (obj.renditions or {}).items()
+        }
+
 
-class PropertySerializer(serializers.ModelSerializer):
+class PropertySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     host = UserSerializer(read_only=True)
     images = serializers.SerializerMethodField()
     average_rating = serializers.ReadOnlyField()
+    amenity_codes = serializers.SerializerMethodField()
 
     class Meta:
         model = Property
         fields = ['property_id', 'host', 'name', 'description', 'location',
-                  'pricepernight', 'bedrooms', 'bathrooms', 'max_guests',
-                  'amenities', 'is_active', 'images', 'average_rating',
+                  'latitude', 'longitude', 'pricepernight', 'bedrooms', 'bathrooms', 'max_guests',
+                  'amenities', 'amenity_codes', 'is_active', 'images', 'average_rating',
                   'created_at', 'updated_at']
         read_only_fields = ['property_id', 'created_at', 'updated_at']
+        expandable_fields = {'host': 'host_id'}
+
+    @classmethod
+    def prepare_queryset(cls, queryset, names, expanded):
+        if 'host' in expanded:
+            queryset = queryset.select_related('host')
+        if 'images' in names:
+            queryset = queryset.prefetch_related('images')
+        return queryset
+
+    def get_amenity_codes(self, obj):
+        return amenity_codes(obj.amenity_mask)
 
     def get_images(self, obj):
         # If property has uploaded images, return them
         if obj.images.exists():
             return PropertyImageSerializer(obj.images.all(), many=True).data
 
-        # Return unique placeholder images as a list
-        image_map = {
-            # Beach/Coastal Properties
-            "Luxury Beach Villa": "https://images.unsplash.com/photo-1613490493576-7fde63acd811?w=1200&q=80",
-            "Charming Cottage by the Sea": "https://images.unsplash.com/photo-1600585154340-be6161a56a0c?w=1200&q=80",
-            "Tropical Island Bungalow": "https://images.unsplash.com/photo-1559827260-dc66d52bef19?w=1200&q=80",
-            "Boho Beachfront Cottage": "https://images.unsplash.com/photo-1499793983690-e29da59ef1c2?w=1200&q=80",
-
-            # Mountain/Cabin Properties
-            "Cozy Mountain Cabin": "https://images.unsplash.com/photo-1587061949409-02df41d5e562?w=1200&q=80",
-            "Ski-In Ski-Out Chalet": "https://images.unsplash.com/photo-1502784444187-359ac186c5bb?w=1200&q=80",
-            "Cozy A-Frame Cabin": "https://images.unsplash.com/photo-1542718610-a1d656d1884c?w=1200&q=80",
-            "Rustic Log Cabin": "https://images.unsplash.com/photo-1449158743715-0a90ebb6d2d8?w=1200&q=80",
-            "Mountain View Glamping Dome": "https://images.unsplash.com/photo-1504280390367-361c6d9f38f4?w=1200&q=80",
-
-            # Urban/City Properties
-            "Downtown Studio Apartment": "https://images.unsplash.com/photo-1522771739844-6a9f6d5f14af?w=1200&q=80",
-            "Modern Loft in Arts District": "https://images.unsplash.com/photo-1536376072261-38c75010e6c9?w=1200&q=80",
-            "Historic Townhouse": "https://images.unsplash.com/photo-1523217582562-09d0def993a6?w=1200&q=80",
-            "Urban Warehouse Loft": "https://images.unsplash.com/photo-1502672260266-1c1ef2d93688?w=1200&q=80",
-            "Oceanview Penthouse": "https://images.unsplash.com/photo-1545324418-cc1a3fa10c00?w=1200&q=80",
-            "Bayfront Condo": "https://images.unsplash.com/photo-1512917774080-9991f1c4c750?w=1200&q=80",
-            "Artist Live-Work Loft": "https://images.unsplash.com/photo-1484154218962-a197022b5858?w=1200&q=80",
-            "Minimalist Japanese Studio": "https://images.unsplash.com/photo-1540518614846-7eded433c457?w=1200&q=80",
-            "Smart Home Apartment": "https://images.unsplash.com/photo-1560448204-e02f11c3d0e2?w=1200&q=80",
-            "Converted Church Loft": "https://images.unsplash.com/photo-1513694203232-719a280e022f?w=1200&q=80",
-
-            # House/Family Properties
-            "Spacious Family House": "https://images.unsplash.com/photo-1570129477492-45c003edd2be?w=1200&q=80",
-            "Ranch Style Farmhouse": "https://images.unsplash.com/photo-1560185127-6a7e5a0f0e12?w=1200&q=80",
-            "Southern Plantation Home": "https://images.unsplash.com/photo-1564013799919-ab600027ffc6?w=1200&q=80",
-            "Gothic Victorian Mansion": "https://images.unsplash.com/photo-1600566753086-00f18fb6b3ea?w=1200&q=80",
-
-            # Countryside/Rural Properties
-            "Romantic Countryside Cottage": "https://images.unsplash.com/photo-1518780664697-55e3ad937233?w=1200&q=80",
-            "Charming Garden Bungalow": "https://images.unsplash.com/photo-1600596542815-ffad4c1539a9?w=1200&q=80",
-            "Wine Country Estate": "https://images.unsplash.com/photo-1580587771525-78b9dba3b914?w=1200&q=80",
-            "River House Retreat": "https://images.unsplash.com/photo-1505916349660-8d91a99c3e23?w=1200&q=80",
-            "Treehouse Hideaway": "https://images.unsplash.com/photo-1587061949409-02df41d5e562?w=1200&q=80",
-
-            # Lake/Water Properties
-            "Lakefront Paradise": "https://images.unsplash.com/photo-1499696010180-025ef6e1a8f9?w=1200&q=80",
-            "Cliffside Mediterranean Villa": "https://images.unsplash.com/photo-1613977257363-707ba9348227?w=1200&q=80",
-
-            # Desert/Southwest Properties
-            "Desert Oasis Retreat": "https://images.unsplash.com/photo-1600607687939-ce8a6c25118c?w=1200&q=80",
-        }
-
-        placeholder_url = image_map.get(obj.name, "https://images.unsplash.com/photo-1568605114967-8130f3a36994?w=1200&q=80")
+        # Return a unique placeholder image as a list
+        placeholder_url = placeholder_image(obj.name)
 
         return [{
             'image_id': None,
@@ -88,76 +126,85 @@ class PropertySerializer(serializers.ModelSerializer):
 class PropertyCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Property
-        fields = ['property_id', 'name', 'description', 'location', 'pricepernight',
-                  'bedrooms', 'bathrooms', 'max_guests', 'amenities']
+        fields = ['property_id', 'name', 'description', 'location', 'latitude', 'longitude',
+                  'pricepernight', 'bedrooms', 'bathrooms', 'max_guests', 'amenities']
         read_only_fields = ['property_id']
 
 
-class PropertyListSerializer(serializers.ModelSerializer):
+class PropertyListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     host_name = serializers.CharField(source='host.full_name', read_only=True)
     average_rating = serializers.ReadOnlyField()
     primary_image = serializers.SerializerMethodField()
+    # Only present on radius searches.
+    distance_km = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Property
-        fields = ['property_id', 'name', 'location', 'pricepernight',
+        fields = ['property_id', 'name', 'location', 'latitude', 'longitude', 'pricepernight',
                   'bedrooms', 'bathrooms', 'max_guests', 'host_name',
-                  'primary_image', 'average_rating']
+                  'primary_image', 'average_rating', 'distance_km']
+
+    @classmethod
+    def prepare_queryset(cls, queryset, names, expanded):
+        if 'host_name' in names:
+            queryset = queryset.select_related('host')
+        if 'primary_image' in names:
+            queryset = queryset.prefetch_related(preview_images_prefetch())
+        return queryset
+
+    def get_value_fields(self, prefix):
+        request = self.context['request']
+        preview = PropertyImage.objects.filter(property=OuterRef(f'{prefix}pk')).order_by(*PREVIEW_IMAGE_ORDERING)
+
+        def primary_image(image, renditions, name):
+            if image:
+                return request.build_absolute_uri(stored_rendition_url(image, renditions, 'card'))
+            return placeholder_image(name)
+
+        return {
+            'host_name': (
+                [f'{prefix}host__first_name', f'{prefix}host__last_name'],
+                lambda first_name, last_name: f"{first_name} {last_name}",
+            ),
+            'primary_image': (
+                [Subquery(preview.values('image')[:1]), Subquery(preview.values('renditions')[:1]), f'{prefix}name'],
+                primary_image,
+            ),
+        }
 
     def get_primary_image(self, obj):
-        primary = obj.images.filter(is_primary=True).first()
-        if primary:
-            return self.context['request'].build_absolute_uri(primary.image.url)
-        first_image = obj.images.first()
-        if first_image:
-            return self.context['request'].build_absolute_uri(first_image.image.url)
-
-        # Return unique placeholder images based on property name
-        image_map = {
-            # Beach/Coastal Properties
-            "Luxury Beach Villa": "https://images.unsplash.com/photo-1613490493576-7fde63acd811?w=1200&q=80",
-            "Charming Cottage by the Sea": "https://images.unsplash.com/photo-1600585154340-be6161a56a0c?w=1200&q=80",
-            "Tropical Island Bungalow": "https://images.unsplash.com/photo-1559827260-dc66d52bef19?w=1200&q=80",
-            "Boho Beachfront Cottage": "https://images.unsplash.com/photo-1499793983690-e29da59ef1c2?w=1200&q=80",
-
-            # Mountain/Cabin Properties
-            "Cozy Mountain Cabin": "https://images.unsplash.com/photo-1587061949409-02df41d5e562?w=1200&q=80",
-            "Ski-In Ski-Out Chalet": "https://images.unsplash.com/photo-1502784444187-359ac186c5bb?w=1200&q=80",
-            "Cozy A-Frame Cabin": "https://images.unsplash.com/photo-1542718610-a1d656d1884c?w=1200&q=80",
-            "Rustic Log Cabin": "https://images.unsplash.com/photo-1449158743715-0a90ebb6d2d8?w=1200&q=80",
-            "Mountain View Glamping Dome": "https://images.unsplash.com/photo-1504280390367-361c6d9f38f4?w=1200&q=80",
-
-            # Urban/City Properties
-            "Downtown Studio Apartment": "https://images.unsplash.com/photo-1522771739844-6a9f6d5f14af?w=1200&q=80",
-            "Modern Loft in Arts District": "https://images.unsplash.com/photo-1536376072261-38c75010e6c9?w=1200&q=80",
-            "Historic Townhouse": "https://images.unsplash.com/photo-1523217582562-09d0def993a6?w=1200&q=80",
-            "Urban Warehouse Loft": "https://images.unsplash.com/photo-1502672260266-1c1ef2d93688?w=1200&q=80",
-            "Oceanview Penthouse": "https://images.unsplash.com/photo-1545324418-cc1a3fa10c00?w=1200&q=80",
-            "Bayfront Condo": "https://images.unsplash.com/photo-1512917774080-9991f1c4c750?w=1200&q=80",
-            "Artist Live-Work Loft": "https://images.unsplash.com/photo-1484154218962-a197022b5858?w=1200&q=80",
-            "Minimalist Japanese Studio": "https://images.unsplash.com/photo-1540518614846-7eded433c457?w=1200&q=80",
-            "Smart Home Apartment": "https://images.unsplash.com/photo-1560448204-e02f11c3d0e2?w=1200&q=80",
-            "Converted Church Loft": "https://images.unsplash.com/photo-1513694203232-719a280e022f?w=1200&q=80",
-
-            # House/Family Properties
-            "Spacious Family House": "https://images.unsplash.com/photo-1570129477492-45c003edd2be?w=1200&q=80",
-            "Ranch Style Farmhouse": "https://images.unsplash.com/photo-1560185127-6a7e5a0f0e12?w=1200&q=80",
-            "Southern Plantation Home": "https://images.unsplash.com/photo-1564013799919-ab600027ffc6?w=1200&q=80",
-            "Gothic Victorian Mansion": "https://images.unsplash.com/photo-1600566753086-00f18fb6b3ea?w=1200&q=80",
-
-            # Countryside/Rural Properties
-            "Romantic Countryside Cottage": "https://images.unsplash.com/photo-1518780664697-55e3ad937233?w=1200&q=80",
-            "Charming Garden Bungalow": "https://images.unsplash.com/photo-1600596542815-ffad4c1539a9?w=1200&q=80",
-            "Wine Country Estate": "https://images.unsplash.com/photo-1580587771525-78b9dba3b914?w=1200&q=80",
-            "River House Retreat": "https://images.unsplash.com/photo-1505916349660-8d91a99c3e23?w=1200&q=80",
-            "Treehouse Hideaway": "https://images.unsplash.com/photo-1587061949409-02df41d5e562?w=1200&q=80",
-
-            # Lake/Water Properties
-            "Lakefront Paradise": "https://images.unsplash.com/photo-1499696010180-025ef6e1a8f9?w=1200&q=80",
-            "Cliffside Mediterranean Villa": "https://images.unsplash.com/photo-1613977257363-707ba9348227?w=1200&q=80",
-
-            # Desert/Southwest Properties
-            "Desert Oasis Retreat": "https://images.unsplash.com/photo-1600607687939-ce8a6c25118c?w=1200&q=80",
-        }
+        # Images are ordered primary-first, so the first one is the card image.
+        # List views preload it through preview_images_prefetch().
+        if hasattr(obj, 'preview_images'):
+            image = obj.preview_images[0] if obj.preview_images else None
+        else:
+            image = obj.images.first()
+        if image:
+            return self.context['request'].build_absolute_uri(rendition_url(image, 'card'))
+
+        return placeholder_image(obj.name)
+
+
+class ImageUploadStartSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+
 
-        return image_map.get(obj.name, "https://images.unsplash.com/photo-1568605114967-8130f3a36994?w=1200&q=80")
+class ImageUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImageUpload
+        fields = ['upload_id', 'property', 'filename', 'size', 'offset', 'checksum',
+                  'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class BlockedDateRangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BlockedDateRange
+        fields = ['block_id', 'start_date', 'end_date', 'reason', 'created_at']
+        read_only_fields = ['block_id', 'created_at']
+
+    def validate(self, data):
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError("End date must not be before start date")
+        return data
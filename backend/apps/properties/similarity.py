@@ -0,0 +1,201 @@
+import hashlib
+import math
+from collections import defaultdict
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from .amenities import AMENITIES
+from .caching import invalidate_all_properties
+from .models import Property, SimilarProperty
+
+DEFAULT_NEIGHBOURS = 12
+# Largest block of the distance matrix held at once, in float32 elements (64 MiB).
+BLOCK_ELEMENTS = 16 * 1024 * 1024
+# Scale of each feature group in the distance. Numeric features are
+# standardized first; locations are points on the unit sphere, scaled so that
+# LOCATION_SCALE_KM apart counts as one standard deviation of a numeric feature.
+# The location text is also hashed into LOCATION_HASHES of LOCATION_BUCKETS
+# columns, so listings in the same place stay close without coordinates; two
+# places only look identical if every one of their hashes collides.
+FEATURE_WEIGHTS = {
+    'price': 2.0,
+    'bedrooms': 1.0,
+    'bathrooms': 0.5,
+    'max_guests': 1.0,
+    'location': 1.0,
+    'location_text': 1.0,
+    'amenity': 0.5,
+}
+LOCATION_SCALE_KM = 100
+LOCATION_BUCKETS = 64
+LOCATION_HASHES = 2
+EARTH_RADIUS_KM = 6371.0
+
+
+def location_token(location):
+    return ' '.join(location.lower().split())
+
+
+def location_buckets(location):
+    # A digest rather than hash() so buckets do not change between processes.
+    digest = hashlib.blake2b(location_token(location).encode(), digest_size=4 * LOCATION_HASHES).digest()
+    return [
+        int.from_bytes(digest[4 * index:4 * index + 4], 'little') % LOCATION_BUCKETS
+        for index in range(LOCATION_HASHES)
+    ]
+
+
+def load_features():
+    """Property ids of every active property and their feature vectors, one row each."""
+    rows = list(Property.objects.filter(is_active=True).values_list(
+        'property_id', 'pricepernight', 'bedrooms', 'bathrooms', 'max_guests',
+        'latitude', 'longitude', 'location', 'amenity_mask',
+    ))
+    ids = [row[0] for row in rows]
+    if not rows:
+        return ids, np.zeros((0, 0), dtype=np.float32)
+
+    numeric = np.array([
+        (math.log1p(float(row[1])), row[2], row[3], row[4]) for row in rows
+    ], dtype=np.float64)
+    std = numeric.std(axis=0)
+    numeric = (numeric - numeric.mean(axis=0)) / np.where(std > 0, std, 1)
+    numeric *= [FEATURE_WEIGHTS[name] for name in ('price', 'bedrooms', 'bathrooms', 'max_guests')]
+
+    location = np.zeros((len(rows), 3))
+    located = np.array([row[5] is not None and row[6] is not None for row in rows])
+    if located.any():
+        lat = np.radians([float(row[5]) for row in rows if row[5] is not None and row[6] is not None])
+        lng = np.radians([float(row[6]) for row in rows if row[5] is not None and row[6] is not None])
+        location[located] = np.column_stack([np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)])
+        # Listings without coordinates take the centre of those sharing their location text.
+        groups = defaultdict(list)
+        for index, row in enumerate(rows):
+            groups[location_token(row[7])].append(index)
+        for members in groups.values():
+            members = np.array(members)
+            known = members[located[members]]
+            if len(known) and len(known) < len(members):
+                location[members[~located[members]]] = location[known].mean(axis=0)
+    location *= FEATURE_WEIGHTS['location'] * EARTH_RADIUS_KM / LOCATION_SCALE_KM
+
+    places = np.zeros((len(rows), LOCATION_BUCKETS))
+    weight = FEATURE_WEIGHTS['location_text'] / math.sqrt(LOCATION_HASHES)
+    for index, row in enumerate(rows):
+        places[index, location_buckets(row[7])] = weight
+
+    masks = np.array([row[8] for row in rows], dtype=np.uint64)
+    amenities = (masks[:, None] >> np.arange(len(AMENITIES), dtype=np.uint64)) & np.uint64(1)
+    amenities = amenities.astype(np.float64) * FEATURE_WEIGHTS['amenity']
+
+    return ids, np.hstack([numeric, location, places, amenities]).astype(np.float32)
+
+
+def distance_blocks(features, rows):
+    """Yield (row indices, squared distances from those rows to every property) in blocks."""
+    norms = np.einsum('ij,ij->i', features, features)
+    block = max(1, BLOCK_ELEMENTS // max(len(features), 1))
+    for start in range(0, len(rows), block):
+        index = rows[start:start + block]
+        distances = norms[index, None] + norms[None, :] - 2 * (features[index] @ features.T)
+        np.maximum(distances, 0, out=distances)
+        yield index, distances
+
+
+def nearest_neighbours(features, rows, k):
+    """Yield (row index, neighbour indices, distances) for ``rows``, nearest first."""
+    k = min(k, len(features) - 1)
+    if k < 1:
+        return
+    for index, distances in distance_blocks(features, rows):
+        distances[np.arange(len(index)), index] = np.inf
+        candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+        order = np.argsort(candidate_distances, axis=1, kind='stable')
+        neighbours = np.take_along_axis(candidates, order, axis=1)
+        neighbour_distances = np.sqrt(np.take_along_axis(candidate_distances, order, axis=1))
+        yield from zip(index, neighbours, neighbour_distances)
+
+
+def stale_rows(ids, features, position, changed, since, k):
+    """
+    Rows whose neighbour lists may differ after ``changed`` properties were
+    edited, added or deactivated: the changed ones themselves, those listing a
+    changed property, and those a changed property now comes closer to than
+    their current last neighbour.
+    """
+    stale = {position[pk] for pk in changed if pk in position}
+    listing_changed = SimilarProperty.objects.filter(
+        similar__updated_at__gt=since
+    ).values_list('property_id', flat=True).distinct()
+    stale.update(position[pk] for pk in listing_changed.iterator() if pk in position)
+
+    lists = {
+        row['property_id']: row
+        for row in SimilarProperty.objects.values('property_id').annotate(count=Count('pk'), last=Max('distance'))
+    }
+    expected = min(k, len(ids) - 1)
+    # Squared distance of the current last neighbour, or inf for short or missing lists.
+    last = np.full(len(ids), np.inf, dtype=np.float32)
+    for pk, index in position.items():
+        current = lists.get(pk)
+        if current and current['count'] >= expected:
+            last[index] = current['last'] ** 2
+
+    changed_rows = np.array(sorted(position[pk] for pk in changed if pk in position), dtype=np.int64)
+    closest = np.full(len(ids), np.inf, dtype=np.float32)
+    for index, distances in distance_blocks(features, changed_rows):
+        distances[np.arange(len(index)), index] = np.inf
+        np.minimum(closest, distances.min(axis=0), out=closest)
+    stale.update(np.flatnonzero((closest < last) | np.isinf(last)).tolist())
+    return sorted(stale)
+
+
+def build_similar_properties(k=DEFAULT_NEIGHBOURS, full=False, batch_size=1000):
+    """
+    Refresh the stored neighbour lists of active properties. Without ``full``
+    only lists that changes since the previous run can affect are recomputed.
+    Returns the number of properties whose lists were written.
+    """
+    started = timezone.now()
+    last_run = None if full else SimilarProperty.objects.aggregate(last=Max('computed_at'))['last']
+
+    # Lists of deactivated or re-ranked properties are replaced below.
+    SimilarProperty.objects.filter(property__is_active=False).delete()
+    ids, features = load_features()
+    position = {pk: index for index, pk in enumerate(ids)}
+    if last_run is None:
+        rows = list(range(len(ids)))
+    else:
+        changed = set(Property.objects.filter(updated_at__gt=last_run).values_list('property_id', flat=True))
+        rows = stale_rows(ids, features, position, changed, last_run, k) if changed else []
+
+    written = 0
+    batch = []
+    for index, neighbours, distances in nearest_neighbours(features, np.array(rows, dtype=np.int64), k):
+        batch.append((ids[index], neighbours, distances))
+        if len(batch) >= batch_size:
+            written += _write(batch, ids, started)
+            batch = []
+    if batch:
+        written += _write(batch, ids, started)
+    if len(ids) < 2:
+        SimilarProperty.objects.all().delete()
+    if written or full:
+        invalidate_all_properties()
+    return written
+
+
+def _write(batch, ids, computed_at):
+    with transaction.atomic():
+        SimilarProperty.objects.filter(property__in=[pk for pk, _, _ in batch]).delete()
+        SimilarProperty.objects.bulk_create([
+            SimilarProperty(
+                property_id=pk, similar_id=ids[neighbour], rank=rank,
+                distance=float(distance), computed_at=computed_at,
+            )
+            for pk, neighbours, distances in batch
+            for rank, (neighbour, distance) in enumerate(zip(neighbours, distances), start=1)
+        ])
+    return len(batch)
@@ -0,0 +1,49 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.users.models import User
+from .models import Property, PropertyImage
+
+
+class PropertyListQueryCountTests(TestCase):
+    """The property list runs the same queries however many rows a page has."""
+
+    def setUp(self):
+        self.host = User.objects.create_user('host@example.com', 'password', first_name='Host', last_name='User')
+        self.client = APIClient()
+        # Authenticated reads bypass the response cache.
+        self.client.force_authenticate(self.host)
+
+    def add_properties(self, count):
+        properties = Property.objects.bulk_create([
+            Property(host=self.host, name=f'Property {index}', description='A place to stay',
+                     location='Lisbon', pricepernight=100)
+            for index in range(count)
+        ])
+        PropertyImage.objects.bulk_create([
+            PropertyImage(property=prop, image=f'properties/{prop.pk}-{index}.jpg', is_primary=index == 0)
+            for prop in properties for index in range(2)
+        ])
+
+    def list_queries(self, expected_rows, url='/api/properties/'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), expected_rows)
+        for row in response.data['results']:
+            self.assertIn('/media/properties/', row['primary_image'])
+            self.assertEqual(row['host_name'], 'Host User')
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.add_properties(5)
+        small = self.list_queries(5)
+        self.add_properties(5)
+        self.assertEqual(self.list_queries(10), small)
+
+    def test_my_properties_query_count_does_not_grow_with_page_size(self):
+        self.add_properties(5)
+        small = self.list_queries(5, '/api/properties/my-properties/')
+        self.add_properties(5)
+        self.assertEqual(self.list_queries(10, '/api/properties/my-properties/'), small)
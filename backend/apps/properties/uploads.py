@@ -0,0 +1,191 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from .models import ImageUpload, Property, PropertyImage
+
+READ_BLOCK_SIZE = 64 * 1024
+# Uploads untouched for this long no longer reserve capacity and can be purged.
+UPLOAD_TTL = timedelta(hours=24)
+ALLOWED_FORMATS = {'JPEG', 'MPO', 'PNG', 'WEBP', 'GIF'}
+
+
+class UploadError(Exception):
+    def __init__(self, message, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def chain_checksum(previous, chunk_digest):
+    """
+    Checksum after one more chunk: sha256(previous checksum + sha256(chunk)).
+    Unlike a single running sha256 it can be persisted between requests, and
+    clients can compute it the same way to check what the server received.
+    """
+    return hashlib.sha256(bytes.fromhex(previous) + chunk_digest).hexdigest()
+
+
+def part_name(upload, offset):
+    """
+    Storage name for the chunk received at ``offset``. Parts live in the
+    default storage, not on the local disk, so any app server behind the load
+    balancer can take the next chunk or complete the upload.
+    """
+    return f'{settings.IMAGE_UPLOAD_PART_DIR}/{upload.upload_id}/{offset:012d}-{uuid.uuid4().hex}'
+
+
+def active_uploads():
+    return ImageUpload.objects.filter(updated_at__gte=timezone.now() - UPLOAD_TTL)
+
+
+def reserved_bytes(property_id):
+    """Bytes held by a property's images plus those promised to its open uploads."""
+    stored = PropertyImage.objects.filter(property_id=property_id).aggregate(total=Sum('file_size'))['total']
+    pending = active_uploads().filter(property_id=property_id).aggregate(total=Sum('size'))['total']
+    return (stored or 0) + (pending or 0)
+
+
+def start_upload(property_obj, user, filename, size):
+    if size <= 0:
+        raise UploadError('size must be positive')
+    if size > settings.IMAGE_UPLOAD_MAX_BYTES:
+        raise UploadError(
+            f'Images may not exceed {settings.IMAGE_UPLOAD_MAX_BYTES} bytes',
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+    with transaction.atomic():
+        # Serialize reservations per property so concurrent uploads cannot
+        # overshoot the cap together.
+        Property.objects.select_for_update().filter(pk=property_obj.pk).first()
+        if reserved_bytes(property_obj.pk) + size > settings.IMAGE_UPLOAD_PROPERTY_MAX_BYTES:
+            raise UploadError(
+                'This property has no room left for another image of this size',
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        upload = ImageUpload.objects.create(
+            property=property_obj, uploader=user, filename=os.path.basename(filename)[:255], size=size,
+            checksum=hashlib.sha256().hexdigest(),
+        )
+    return upload
+
+
+def is_expired(upload):
+    return upload.updated_at < timezone.now() - UPLOAD_TTL
+
+
+def check_chunk(upload, offset, length):
+    if upload is None:
+        raise UploadError('Upload not found', status.HTTP_404_NOT_FOUND)
+    if is_expired(upload):
+        raise UploadError('This upload has expired', status.HTTP_410_GONE)
+    if offset != upload.offset:
+        raise UploadError(f'Expected offset {upload.offset}', status.HTTP_409_CONFLICT)
+    if offset + length > upload.size:
+        raise UploadError('Chunk extends past the declared size', status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+
+def append_chunk(upload_id, stream, offset, length, chunk_sha256=None):
+    """
+    Store one chunk from the request body as a part of the upload.
+
+    Sizes are checked against Content-Length before anything is read. The body
+    is spooled to a local temporary file in READ_BLOCK_SIZE blocks and saved to
+    storage with no transaction open, so a slow client or storage backend holds
+    no database lock and memory use does not depend on the chunk or file size.
+    Only the re-check and the row update run under the row lock; a part that
+    loses a race for its offset is deleted again.
+    """
+    if length is None:
+        raise UploadError('Content-Length is required', status.HTTP_411_LENGTH_REQUIRED)
+    if length > settings.IMAGE_UPLOAD_CHUNK_MAX_BYTES:
+        raise UploadError(
+            f'Chunks may not exceed {settings.IMAGE_UPLOAD_CHUNK_MAX_BYTES} bytes',
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+    upload = ImageUpload.objects.filter(pk=upload_id).first()
+    check_chunk(upload, offset, length)
+
+    digest = hashlib.sha256()
+    received = 0
+    with tempfile.TemporaryFile() as staged:
+        while received < length:
+            block = stream.read(min(READ_BLOCK_SIZE, length - received)) if stream else b''
+            if not block:
+                break
+            digest.update(block)
+            staged.write(block)
+            received += len(block)
+        if received != length:
+            raise UploadError('The chunk ended before Content-Length bytes were received')
+        if chunk_sha256 and chunk_sha256.lower() != digest.hexdigest():
+            raise UploadError('Chunk checksum mismatch')
+        staged.seek(0)
+        name = default_storage.save(part_name(upload, offset), File(staged))
+
+    accepted = False
+    try:
+        with transaction.atomic():
+            # Another chunk for the same offset may have landed meanwhile.
+            upload = ImageUpload.objects.select_for_update().filter(pk=upload_id).first()
+            check_chunk(upload, offset, length)
+            upload.parts.append(name)
+            upload.offset += received
+            upload.checksum = chain_checksum(upload.checksum, digest.digest())
+            upload.save(update_fields=['parts', 'offset', 'checksum', 'updated_at'])
+        accepted = True
+    finally:
+        if not accepted:
+            default_storage.delete(name)
+    return upload
+
+
+def complete_upload(upload, is_primary=False):
+    """Turn a fully received upload into a PropertyImage."""
+    with transaction.atomic():
+        # Locked so no chunk is appended, and no second completion runs, meanwhile.
+        upload = ImageUpload.objects.select_for_update().filter(pk=upload.pk).first()
+        if upload is None:
+            raise UploadError('Upload not found', status.HTTP_404_NOT_FOUND)
+        if is_expired(upload):
+            raise UploadError('This upload has expired', status.HTTP_410_GONE)
+        if upload.offset != upload.size:
+            raise UploadError(f'Only {upload.offset} of {upload.size} bytes received', status.HTTP_409_CONFLICT)
+        with tempfile.TemporaryFile() as assembled:
+            for name in upload.parts:
+                with default_storage.open(name, 'rb') as part:
+                    shutil.copyfileobj(part, assembled, READ_BLOCK_SIZE)
+            assembled.seek(0)
+            try:
+                with Image.open(assembled) as image:
+                    image_format = image.format
+                    image.verify()
+            except Exception:
+                raise UploadError('The uploaded file is not a valid image')
+            if image_format not in ALLOWED_FORMATS:
+                raise UploadError(f'{image_format} images are not supported')
+
+            assembled.seek(0)
+            property_image = PropertyImage(property_id=upload.property_id, is_primary=is_primary)
+            # Storage copies the file in chunks.
+            property_image.image.save(upload.filename, File(assembled), save=False)
+        property_image.save()
+        discard_upload(upload)
+    return property_image
+
+
+def discard_upload(upload):
+    parts = list(upload.parts)
+    upload.delete()
+    for name in parts:
+        default_storage.delete(name)
@@ -1,16 +1,35 @@
 from django.urls import path
 from .views import (
     PropertyListView,
+    AmenityListView,
+    PropertyFacetsView,
     PropertyCreateView,
     PropertyDetailView,
+    SimilarPropertiesView,
+    PropertyCalendarView,
+    BlockedDateRangeListView,
+    BlockedDateRangeDetailView,
     MyPropertiesView,
-    PropertyImageUploadView
+    PropertyImageUploadView,
+    ImageUploadStartView,
+    ImageUploadView,
+    ImageUploadCompleteView
 )
 
 urlpatterns = [
     path('', PropertyListView.as_view(), name='property-list'),
     path('create/', PropertyCreateView.as_view(), name='property-create'),
     path('my-properties/', MyPropertiesView.as_view(), name='my-properties'),
+    path('amenities/', AmenityListView.as_view(), name='amenity-list'),
+    path('facets/', PropertyFacetsView.as_view(), name='property-facets'),
     path('<uuid:property_id>/', PropertyDetailView.as_view(), name='property-detail'),
+    path('<uuid:property_id>/similar/', SimilarPropertiesView.as_view(), name='similar-properties'),
+    path('<uuid:property_id>/calendar/', PropertyCalendarView.as_view(), name='property-calendar'),
+    path('<uuid:property_id>/blocked-dates/', BlockedDateRangeListView.as_view(), name='blocked-dates'),
+    path('<uuid:property_id>/blocked-dates/<uuid:block_id>/', BlockedDateRangeDetailView.as_view(),
+         name='blocked-date-detail'),
     path('<uuid:property_id>/images/', PropertyImageUploadView.as_view(), name='property-image-upload'),
+    path('<uuid:property_id>/uploads/', ImageUploadStartView.as_view(), name='image-upload-start'),
+    path('uploads/<uuid:upload_id>/', ImageUploadView.as_view(), name='image-upload'),
+    path('uploads/<uuid:upload_id>/complete/', ImageUploadCompleteView.as_view(), name='image-upload-complete'),
 ]
@@ -1,25 +1,194 @@
-from rest_framework import generics, filters, status
+import datetime
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils import timezone
+from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Property, PropertyImage
+from airbnb_project.cache import CachedResponseMixin
+from airbnb_project.conditional import ConditionalMixin, make_etag
+from airbnb_project.pagination import KeysetPagination
+from airbnb_project.serializers import SparseFieldsViewMixin, ValuesListMixin
+from .amenities import AMENITIES, amenity_facets
+from .availability import MAX_CALENDAR_DAYS, availability_bitmap, unavailable_runs
+from .caching import (
+    ALL_NAMESPACE, AVAILABILITY_NAMESPACE, LIST_NAMESPACE, calendar_namespace, detail_namespace
+)
+from .facets import property_facets
+from .filters import PropertyFilterSet, PropertySearchFilter, PropertyOrderingFilter
+from .models import BlockedDateRange, ImageUpload, Property, PropertyImage
 from .serializers import (
     PropertySerializer,
     PropertyCreateSerializer,
     PropertyListSerializer,
-    PropertyImageSerializer
+    PropertyImageSerializer,
+    BlockedDateRangeSerializer,
+    ImageUploadSerializer,
+    ImageUploadStartSerializer
 )
+from .uploads import UploadError, append_chunk, complete_upload, discard_upload, start_upload
+from apps.reviews.models import Review
 
 
-class PropertyListView(generics.ListAPIView):
+class PropertyListView(ValuesListMixin, SparseFieldsViewMixin, CachedResponseMixin,
+                       generics.ListAPIView):
     queryset = Property.objects.filter(is_active=True)
     serializer_class = PropertyListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['location', 'bedrooms', 'bathrooms']
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, PropertySearchFilter, PropertyOrderingFilter]
+    filterset_class = PropertyFilterSet
     search_fields = ['name', 'description', 'location', 'amenities']
-    ordering_fields = ['pricepernight', 'created_at']
+    ordering_fields = ['pricepernight', 'created_at', 'rating', 'popularity']
     ordering = ['-created_at']
+    cache_prefix = 'property-list'
+
+    def get_cache_namespaces(self):
+        namespaces = [ALL_NAMESPACE, LIST_NAMESPACE]
+        params = self.request.query_params
+        if 'check_in' in params or 'check_out' in params:
+            namespaces.append(AVAILABILITY_NAMESPACE)
+        return namespaces
+
+
+class AmenityListView(PropertyListView):
+    """Amenity vocabulary with the number of listed properties offering each one."""
+    pagination_class = None
+    cache_prefix = 'amenity-list'
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        counts = amenity_facets(queryset)
+        return Response([
+            {'code': code, 'label': label, 'count': counts[code]}
+            for code, label, _ in AMENITIES
+        ])
+
+
+class PropertyFacetsView(PropertyListView):
+    """Facet counts for the property list under the same filter and search parameters."""
+    pagination_class = None
+    cache_prefix = 'property-facets'
+    cache_ignored_params = ('page', 'page_size', 'cursor', 'ordering')
+
+    def should_cache(self, request):
+        # Facets do not depend on the user.
+        return True
+
+    def list(self, request, *args, **kwargs):
+        return Response(property_facets(self.filter_queryset(self.get_queryset())))
+
+
+class SimilarPropertiesView(ValuesListMixin, SparseFieldsViewMixin, CachedResponseMixin,
+                            generics.ListAPIView):
+    """The stored nearest neighbours of a property, see build_similar_properties."""
+    serializer_class = PropertyListSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = None
+    cache_prefix = 'similar-properties'
+
+    def get_queryset(self):
+        return Property.objects.filter(
+            neighbour_of__property_id=self.kwargs['property_id'], is_active=True,
+        ).order_by('neighbour_of__rank')
+
+    def get_cache_namespaces(self):
+        return [ALL_NAMESPACE, LIST_NAMESPACE]
+
+
+class PropertyCalendarView(CachedResponseMixin, generics.RetrieveAPIView):
+    """
+    Availability of a property for each day from ``?from=`` (default today) to
+    ``?to=`` (inclusive, default 90 days), as the runs of unavailable days or,
+    with ``?output=bitmap``, one character per day ('1' free, '0' taken).
+    """
+    queryset = Property.objects.all()
+    lookup_field = 'property_id'
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    cache_prefix = 'property-calendar'
+    cache_timeout = 300
+    default_days = 90
+
+    def should_cache(self, request):
+        # The calendar does not depend on the user.
+        return True
+
+    def get_cache_namespaces(self):
+        property_id = self.kwargs['property_id']
+        return [ALL_NAMESPACE, detail_namespace(property_id), calendar_namespace(property_id)]
+
+    def retrieve(self, request, property_id):
+        output = request.query_params.get('output', 'ranges')
+        if output not in ('ranges', 'bitmap'):
+            return Response({'error': 'output must be ranges or bitmap'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            first = self.parse_date('from') or timezone.localdate()
+            last = self.parse_date('to') or first + datetime.timedelta(days=self.default_days - 1)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if first > last:
+            return Response({'error': 'from must not be after to'}, status=status.HTTP_400_BAD_REQUEST)
+        if (last - first).days >= MAX_CALENDAR_DAYS:
+            return Response({'error': f'The calendar covers at most {MAX_CALENDAR_DAYS} days'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not Property.objects.filter(property_id=property_id).exists():
+            return Response({'error': 'Property not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        bitmap = availability_bitmap(property_id, first, last)
+        data = {'property_id': str(property_id), 'from': first.isoformat(), 'to': last.isoformat()}
+        if output == 'bitmap':
+            data['availability'] = bitmap
+        else:
+            data['unavailable'] = [
+                {'start': start.isoformat(), 'end': end.isoformat()} for start, end in unavailable_runs(bitmap, first)
+            ]
+        return Response(data)
+
+    def parse_date(self, param):
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f'{param} must be a date in YYYY-MM-DD format')
+
+
+class BlockedDateRangeListView(generics.ListCreateAPIView):
+    """Date ranges the host has blocked on one of their properties."""
+    serializer_class = BlockedDateRangeSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return BlockedDateRange.objects.filter(
+            property_id=self.kwargs['property_id'], property__host=self.request.user
+        ).order_by('start_date', 'block_id')
+
+    def create(self, request, property_id):
+        property_obj = Property.objects.filter(property_id=property_id).first()
+        if property_obj is None:
+            return Response({'error': 'Property not found'}, status=status.HTTP_404_NOT_FOUND)
+        if property_obj.host_id != request.user.pk:
+            return Response(
+                {'error': 'You do not have permission to block dates on this property'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(property=property_obj)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class BlockedDateRangeDetailView(generics.RetrieveDestroyAPIView):
+    serializer_class = BlockedDateRangeSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'block_id'
+
+    def get_queryset(self):
+        return BlockedDateRange.objects.filter(
+            property_id=self.kwargs['property_id'], property__host=self.request.user
+        )
 
 
 class PropertyCreateView(generics.CreateAPIView):
@@ -31,11 +200,39 @@ class PropertyCreateView(generics.CreateAPIView):
         serializer.save(host=self.request.user)
 
 
-class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PropertyDetailView(SparseFieldsViewMixin, ConditionalMixin, CachedResponseMixin,
+                         generics.RetrieveUpdateDestroyAPIView):
     queryset = Property.objects.all()
     serializer_class = PropertySerializer
     lookup_field = 'property_id'
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cache_prefix = 'property-detail'
+    cache_timeout = 300
+
+    def get_cache_namespaces(self):
+        return [ALL_NAMESPACE, detail_namespace(self.kwargs['property_id'])]
+
+    def get_version(self):
+        # The detail embeds the host and images and reports the rating, so its
+        # version covers their latest changes as well as the property row.
+        images = PropertyImage.objects.filter(property=OuterRef('pk')).order_by().values('property')
+        reviews = Review.objects.filter(review_property=OuterRef('pk')).order_by().values('review_property')
+        row = Property.objects.filter(property_id=self.kwargs['property_id']).annotate(
+            images_changed=Subquery(images.annotate(latest=Max('updated_at')).values('latest')),
+            image_count=Subquery(images.annotate(total=Count('pk')).values('total')),
+            reviews_changed=Subquery(reviews.annotate(latest=Max('updated_at')).values('latest')),
+        ).values(
+            'property_id', 'updated_at', 'host__updated_at', 'images_changed', 'image_count',
+            'reviews_changed', 'review_count', 'rating_sum',
+        ).first()
+        if row is None:
+            return None
+        changes = [row['updated_at'], row['host__updated_at'], row['images_changed'], row['reviews_changed']]
+        # ?fields and ?expand change the representation.
+        return (
+            make_etag(*row.values(), self.request.GET.urlencode()),
+            max(change for change in changes if change),
+        )
 
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -58,7 +255,7 @@ class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class MyPropertiesView(generics.ListAPIView):
+class MyPropertiesView(ValuesListMixin, SparseFieldsViewMixin, generics.ListAPIView):
     serializer_class = PropertyListSerializer
     permission_classes = [IsAuthenticated]
 
@@ -82,3 +279,88 @@ class PropertyImageUploadView(generics.CreateAPIView):
             )
 
         serializer.save(property=property_obj)
+
+
+class ImageUploadStartView(generics.GenericAPIView):
+    """Start a resumable chunked image upload for a property."""
+    serializer_class = ImageUploadStartSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, property_id):
+        try:
+            property_obj = Property.objects.get(property_id=property_id)
+        except Property.DoesNotExist:
+            return Response({'error': 'Property not found'}, status=status.HTTP_404_NOT_FOUND)
+        if property_obj.host != request.user:
+            return Response(
+                {'error': 'You do not have permission to add images to this property'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = start_upload(
+                property_obj, request.user,
+                serializer.validated_data['filename'], serializer.validated_data['size'],
+            )
+        except UploadError as exc:
+            return Response({'error': exc.message}, status=exc.status_code)
+        return Response(ImageUploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+
+class ImageUploadView(APIView):
+    """
+    GET reports how much of an upload has been received, PATCH appends the raw
+    request body at the ``Upload-Offset`` header and DELETE abandons it. An
+    optional ``Upload-Checksum`` header carries the chunk's sha256 hex digest.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_upload(self, request, upload_id):
+        return ImageUpload.objects.filter(upload_id=upload_id, uploader=request.user).first()
+
+    def get(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        if upload is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ImageUploadSerializer(upload).data)
+
+    def patch(self, request, upload_id):
+        # The body is streamed from request.stream; never touch request.data.
+        if self.get_upload(request, upload_id) is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers['Content-Length']) if request.headers.get('Content-Length') else None
+        except ValueError:
+            return Response({'error': 'Upload-Offset and Content-Length must be integers'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            upload = append_chunk(upload_id, request.stream, offset, length, request.headers.get('Upload-Checksum'))
+        except UploadError as exc:
+            return Response({'error': exc.message}, status=exc.status_code)
+        return Response(ImageUploadSerializer(upload).data)
+
+    def delete(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        if upload is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        discard_upload(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ImageUploadCompleteView(APIView):
+    """Finish a fully received upload into a PropertyImage."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, upload_id):
+        upload = ImageUpload.objects.filter(upload_id=upload_id, uploader=request.user).first()
+        if upload is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        is_primary = str(request.data.get('is_primary', '')).lower() in ('1', 'true')
+        try:
+            image = complete_upload(upload, is_primary=is_primary)
+        except UploadError as exc:
+            return Response({'error': exc.message}, status=exc.status_code)
+        return Response(PropertyImageSerializer(image).data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0006_keyset_indexes'),
+        ('reviews', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['review_property', 'created_at', 'review_id'], name='reviews_propert_ac98d2_idx'),
+        ),
+    ]
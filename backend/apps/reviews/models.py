@@ -1,5 +1,5 @@
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from apps.users.models import User
 from apps.properties.models import Property
@@ -22,7 +22,38 @@ class Review(models.Model):
         indexes = [
             models.Index(fields=['review_property']),
             models.Index(fields=['user']),
+            models.Index(fields=['review_property', 'created_at', 'review_id']),
         ]
 
     def __str__(self):
         return f"Review by {self.user.full_name} for {self.review_property.name}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_rating = instance.__dict__.get('rating')
+        return instance
+
+    def _stored_rating(self):
+        rating = getattr(self, '_loaded_rating', None)
+        if rating is None:
+            rating = Review.objects.filter(pk=self.pk).values_list('rating', flat=True).first()
+        return rating
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            previous = None if adding else self._stored_rating()
+            super().save(*args, **kwargs)
+            if adding:
+                Property.apply_rating_change(self.review_property_id, self.rating, 1)
+            elif previous is not None and previous != self.rating:
+                Property.apply_rating_change(self.review_property_id, self.rating - previous, 0)
+        self._loaded_rating = self.rating
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            rating = self._stored_rating()
+            result = super().delete(*args, **kwargs)
+            Property.apply_rating_change(self.review_property_id, -rating, -1)
+        return result
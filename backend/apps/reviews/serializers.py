@@ -1,17 +1,25 @@
 from rest_framework import serializers
+from airbnb_project.serializers import SparseFieldsMixin
 from .models import Review
 from apps.users.serializers import UserSerializer
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
-    property = serializers.UUIDField(source='review_property.property_id', read_only=True)
+    property = serializers.UUIDField(source='review_property_id', read_only=True)
 
     class Meta:
         model = Review
         fields = ['review_id', 'property', 'user', 'rating', 'comment',
                   'created_at', 'updated_at']
         read_only_fields = ['review_id', 'created_at', 'updated_at']
+        expandable_fields = {'user': 'user_id'}
+
+    @classmethod
+    def prepare_queryset(cls, queryset, names, expanded):
+        if 'user' in expanded:
+            queryset = queryset.select_related('user')
+        return queryset
 
 
 class ReviewCreateSerializer(serializers.ModelSerializer):
@@ -1,18 +1,35 @@
+from django.db.models import Count, Max
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
+from airbnb_project.conditional import ConditionalMixin, make_etag
+from airbnb_project.pagination import KeysetPagination
+from airbnb_project.serializers import SparseFieldsViewMixin, ValuesListMixin
 from .models import Review
 from .serializers import ReviewSerializer, ReviewCreateSerializer
 from apps.properties.models import Property
 
 
-class ReviewListView(generics.ListAPIView):
+class ReviewListView(ValuesListMixin, SparseFieldsViewMixin, ConditionalMixin, generics.ListAPIView):
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         property_id = self.kwargs.get('property_id')
-        return Review.objects.filter(review_property_id=property_id)
+        return Review.objects.filter(review_property_id=property_id).order_by('-created_at')
+
+    def get_version(self):
+        # Count catches deletions; the page parameters are part of the
+        # representation.
+        stats = Review.objects.filter(review_property_id=self.kwargs.get('property_id')).aggregate(
+            total=Count('pk'), reviews_changed=Max('updated_at'), users_changed=Max('user__updated_at'),
+        )
+        changes = [change for change in (stats['reviews_changed'], stats['users_changed']) if change]
+        return (
+            make_etag(self.kwargs.get('property_id'), *stats.values(), self.request.GET.urlencode()),
+            max(changes) if changes else None,
+        )
 
 
 class ReviewCreateView(generics.CreateAPIView):
@@ -54,7 +71,7 @@ class ReviewCreateView(generics.CreateAPIView):
         )
 
 
-class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ReviewDetailView(SparseFieldsViewMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     lookup_field = 'review_id'
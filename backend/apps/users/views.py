@@ -2,6 +2,7 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
+from airbnb_project.conditional import ConditionalMixin, make_etag
 from .models import User
 from .serializers import (
     UserRegistrationSerializer,
@@ -60,7 +61,13 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
-class UserDetailView(generics.RetrieveAPIView):
+class UserDetailView(ConditionalMixin, generics.RetrieveAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     lookup_field = 'user_id'
+
+    def get_version(self):
+        row = User.objects.filter(user_id=self.kwargs['user_id']).values_list('user_id', 'updated_at').first()
+        if row is None:
+            return None
+        return make_etag(*row), row[1]
@@ -0,0 +1,88 @@
+"""
+Latency of the property list's ?check_in=&check_out=&guests= availability
+filter over a large booking table.
+
+    python -m benchmarks.availability --bookings 100000
+"""
+import argparse
+import datetime
+import random
+
+from benchmarks.common import benchmark_database, timed
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from rest_framework.test import APIClient
+from apps.bookings.models import Booking
+from apps.properties.models import Property
+from apps.users.models import User
+
+FIRST_DAY = datetime.date(2030, 1, 1)
+
+
+def seed(properties, bookings, rng):
+    host = User.objects.create_user('host@example.com', 'password', first_name='Bench', last_name='Host')
+    listings = Property.objects.bulk_create([
+        Property(host=host, name=f'Property {index}', description='Benchmark listing', location='Lisbon',
+                 pricepernight=100, max_guests=rng.randint(1, 8))
+        for index in range(properties)
+    ], batch_size=1000)
+    rows = []
+    for _ in range(bookings):
+        start = FIRST_DAY + datetime.timedelta(days=rng.randrange(365))
+        rows.append(Booking(
+            booking_property=rng.choice(listings), user=host, start_date=start,
+            end_date=start + datetime.timedelta(days=rng.randint(1, 7)), guests=1, total_price=100,
+            status=rng.choice(('pending', 'confirmed', 'confirmed', 'canceled')),
+        ))
+    # bulk_create skips Booking.save(), so overlaps are allowed here; the
+    # filter only has to exclude them, not prevent them.
+    Booking.objects.bulk_create(rows, batch_size=5000)
+    return host
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--properties', type=int, default=2000)
+    parser.add_argument('--bookings', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=50, help='Random stays looked up per measurement')
+    args = parser.parse_args()
+    rng = random.Random(8)
+
+    with benchmark_database():
+        host = seed(args.properties, args.bookings, rng)
+        client = APIClient()
+        # Authenticated reads skip the response cache, so every request hits the database.
+        client.force_authenticate(host)
+        stays = []
+        for _ in range(args.queries):
+            check_in = FIRST_DAY + datetime.timedelta(days=rng.randrange(365))
+            stays.append((check_in, check_in + datetime.timedelta(days=rng.randint(1, 10)), rng.randint(1, 6)))
+
+        def request(params):
+            response = client.get('/api/properties/', params)
+            assert response.status_code == 200, response.content
+            return response
+
+        baseline, _ = timed(lambda: request({'page_size': 20}), args.queries)
+        timings = []
+        for check_in, check_out, guests in stays:
+            elapsed, response = timed(lambda: request({
+                'check_in': check_in.isoformat(), 'check_out': check_out.isoformat(),
+                'guests': guests, 'page_size': 20,
+            }), 1)
+            timings.append(elapsed)
+        timings.sort()
+
+        print(f'{args.properties} properties, {Booking.objects.count()} bookings ({connection.vendor})')
+        print(f'unfiltered page:    median {baseline * 1e3:.1f} ms')
+        print(f'availability page:  median {timings[len(timings) // 2] * 1e3:.1f} ms, '
+              f'p95 {timings[int(len(timings) * 0.95) - 1] * 1e3:.1f} ms over {len(timings)} stays')
+
+        check_in, check_out, _ = stays[0]
+        overlapping = Booking.objects.filter(booking_property=OuterRef('pk')).active().overlapping(check_in, check_out)
+        print('\nPlan of the booking anti-join:')
+        print(Property.objects.filter(~Exists(overlapping)).explain())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Hammer one hot property with concurrent booking requests and check that no
+two active bookings overlap, reporting the sustained throughput.
+
+    python -m benchmarks.booking_contention --threads 16 --attempts 60
+
+Exits with status 1 on a double booking or an unexpected error.
+"""
+import argparse
+import datetime
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from benchmarks.common import benchmark_database
+from django.db import connection
+from rest_framework.test import APIClient
+from apps.bookings.models import Booking
+from apps.properties.models import Property
+from apps.users.models import User
+
+FIRST_DAY = datetime.date(2030, 1, 1)
+
+
+def attempt(client, property_id, start, nights):
+    try:
+        response = client.post('/api/bookings/create/', {
+            'property_id': str(property_id),
+            'start_date': start.isoformat(),
+            'end_date': (start + datetime.timedelta(days=nights)).isoformat(),
+            'guests': 1,
+        }, format='json')
+    except Exception as exc:
+        return f'error {type(exc).__name__}'
+    if response.status_code == 201:
+        return 'booked'
+    if response.status_code == 400:
+        return 'rejected'
+    return f'error {response.status_code}'
+
+
+def hammer(property_id, user, attempts, days, seed, outcomes, lock):
+    rng = random.Random(seed)
+    client = APIClient()
+    client.force_authenticate(user)
+    try:
+        for _ in range(attempts):
+            start = FIRST_DAY + datetime.timedelta(days=rng.randrange(days))
+            outcome = attempt(client, property_id, start, rng.randint(1, 5))
+            with lock:
+                outcomes[outcome] += 1
+    finally:
+        connection.close()
+
+
+def double_bookings(property_id):
+    """Pairs of active bookings of the property whose dates overlap."""
+    stays = sorted(Booking.objects.filter(booking_property_id=property_id).active().values_list('start_date', 'end_date'))
+    overlaps = 0
+    latest_end = None
+    for start, end in stays:
+        # Same inclusive rule as BookingQuerySet.overlapping().
+        if latest_end is not None and start <= latest_end:
+            overlaps += 1
+        latest_end = end if latest_end is None else max(latest_end, end)
+    return overlaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--attempts', type=int, default=60, help='Booking requests per thread')
+    parser.add_argument('--days', type=int, default=365, help='Days the requested stays start in')
+    args = parser.parse_args()
+    # Rejected requests are expected; keep their 400 warnings out of the report.
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+
+    with benchmark_database():
+        host = User.objects.create_user('host@example.com', 'password', first_name='Bench', last_name='Host')
+        hot = Property.objects.create(host=host, name='Hot property', description='Benchmark listing',
+                                      location='Lisbon', pricepernight=100, max_guests=4)
+        guests = [
+            User.objects.create_user(f'guest{index}@example.com', 'password', first_name='Guest', last_name=str(index))
+            for index in range(args.threads)
+        ]
+
+        outcomes = Counter()
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(target=hammer, args=(hot.pk, guest, args.attempts, args.days, index, outcomes, lock))
+            for index, guest in enumerate(guests)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        total = sum(outcomes.values())
+        overlaps = double_bookings(hot.pk)
+        errors = sum(count for outcome, count in outcomes.items() if outcome.startswith('error'))
+        print(f'{args.threads} threads x {args.attempts} requests on one property ({connection.vendor})')
+        print(f'outcomes: {dict(outcomes)}')
+        print(f'throughput: {total / elapsed:.0f} requests/s, {outcomes["booked"] / elapsed:.0f} bookings/s')
+        print(f'active bookings: {Booking.objects.filter(booking_property=hot).active().count()}, '
+              f'double bookings: {overlaps}')
+    if overlaps or errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
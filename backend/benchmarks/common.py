@@ -0,0 +1,55 @@
+"""
+Shared setup for the benchmark scripts in this package.
+
+Run them from backend/ as modules, e.g. ``python -m benchmarks.availability``.
+Each one builds a throwaway copy of the configured database (``test_<NAME>``
+on PostgreSQL, a temporary file on SQLite), seeds it and drops it afterwards,
+so the data in DATABASE_URL is never touched.
+"""
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'airbnb_project.settings')
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment, teardown_test_environment  # noqa: E402
+
+
+@contextmanager
+def benchmark_database():
+    """Create, migrate and finally drop a scratch database for one benchmark run."""
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    scratch = None
+    if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+        # The default in-memory test database cannot be shared between threads
+        # the way a real one is, so benchmarks use a file.
+        scratch = tempfile.NamedTemporaryFile(suffix='.sqlite3', delete=False)
+        scratch.close()
+        test_settings['NAME'] = scratch.name
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        if scratch is not None:
+            test_settings.pop('NAME')
+
+
+def timed(function, repeat):
+    """Run ``function`` ``repeat`` times; return the median wall time in seconds and the last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
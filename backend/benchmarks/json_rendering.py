@@ -0,0 +1,81 @@
+"""
+Encode time and peak allocations of FastJSONRenderer against DRF's stdlib
+JSONRenderer on PropertyListSerializer and BookingSerializer pages.
+
+    python -m benchmarks.json_rendering --page-size 100
+"""
+import argparse
+import datetime
+import timeit
+import tracemalloc
+from decimal import Decimal
+
+from benchmarks.common import benchmark_database
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from airbnb_project.renderers import FastJSONRenderer
+from apps.bookings.models import Booking
+from apps.bookings.serializers import BookingSerializer
+from apps.properties.models import Property
+from apps.properties.serializers import PropertyListSerializer
+from apps.users.models import User
+
+
+def seed(count):
+    host = User.objects.create_user('host@example.com', 'password', first_name='Bench', last_name='Host')
+    guest = User.objects.create_user('guest@example.com', 'password', first_name='Bench', last_name='Guest')
+    properties = Property.objects.bulk_create([
+        Property(host=host, name=f'Property {index}', description='Benchmark listing', location='Lisbon',
+                 latitude=Decimal('38.722252'), longitude=Decimal('-9.139337'),
+                 pricepernight=Decimal('85.50') + index)
+        for index in range(count)
+    ])
+    first_day = datetime.date(2030, 1, 1)
+    Booking.objects.bulk_create([
+        Booking(booking_property=prop, user=guest, start_date=first_day + datetime.timedelta(days=index),
+                end_date=first_day + datetime.timedelta(days=index + 2), guests=2, total_price=prop.pricepernight * 2)
+        for index, prop in enumerate(properties)
+    ])
+
+
+def peak_allocation(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--number', type=int, default=200, help='Encodes timed per renderer')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        seed(args.page_size)
+        request = Request(APIRequestFactory().get('/'))
+        pages = [
+            (PropertyListSerializer, Property.objects.select_related('host').order_by('-created_at')),
+            (BookingSerializer, Booking.objects.select_related('booking_property__host', 'user').order_by('-created_at')),
+        ]
+        renderers = [('stdlib', JSONRenderer()), ('fast', FastJSONRenderer())]
+        for serializer_class, queryset in pages:
+            results = serializer_class(queryset, many=True, context={'request': request}).data
+            payload = {'count': len(results), 'next': None, 'previous': None, 'results': results}
+            encoded = {name: renderer.render(payload) for name, renderer in renderers}
+            assert encoded['stdlib'] == encoded['fast'], f'{serializer_class.__name__} output differs'
+
+            print(f'{serializer_class.__name__}, page of {len(results)} ({len(encoded["stdlib"]):,} bytes)')
+            seconds = {}
+            for name, renderer in renderers:
+                seconds[name] = timeit.timeit(lambda: renderer.render(payload), number=args.number) / args.number
+                peak = peak_allocation(lambda: renderer.render(payload))
+                print(f'  {name:<7}{seconds[name] * 1e3:8.3f} ms  peak alloc {peak / 1024:8.0f} KiB')
+            print(f'  speedup x{seconds["stdlib"] / seconds["fast"]:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Rows per second of the values() fast path (ValuesRepresentation) against
+the DRF serializers it replaces, for the property, booking and message lists.
+
+    python -m benchmarks.list_serialization --rows 1000
+"""
+import argparse
+import datetime
+import random
+from decimal import Decimal
+
+from benchmarks.common import benchmark_database, timed
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from airbnb_project.serializers import ValuesRepresentation
+from apps.bookings.models import Booking
+from apps.bookings.serializers import BookingSerializer
+from apps.messages.models import Message
+from apps.messages.serializers import MessageSerializer
+from apps.properties.models import Property, PropertyImage
+from apps.properties.serializers import PropertyListSerializer
+from apps.users.models import User
+
+
+def seed(rows, rng):
+    host = User.objects.create_user('host@example.com', 'password', first_name='Bench', last_name='Host')
+    guest = User.objects.create_user('guest@example.com', 'password', first_name='Bench', last_name='Guest')
+    properties = Property.objects.bulk_create([
+        Property(host=host, name=f'Property {index}', description='Benchmark listing', location='Lisbon',
+                 latitude=Decimal('38.722252') if index % 2 else None,
+                 longitude=Decimal('-9.139337') if index % 2 else None,
+                 pricepernight=Decimal(rng.randint(4000, 40000)) / 100, max_guests=rng.randint(1, 8))
+        for index in range(rows)
+    ], batch_size=1000)
+    PropertyImage.objects.bulk_create([
+        PropertyImage(property=prop, image=f'properties/{prop.pk}.jpg', is_primary=True)
+        for prop in properties[::2]
+    ], batch_size=1000)
+    first_day = datetime.date(2030, 1, 1)
+    Booking.objects.bulk_create([
+        Booking(booking_property=prop, user=guest, start_date=first_day + datetime.timedelta(days=index % 300),
+                end_date=first_day + datetime.timedelta(days=index % 300 + 3), guests=2,
+                total_price=prop.pricepernight * 3)
+        for index, prop in enumerate(properties)
+    ], batch_size=1000)
+    Message.objects.bulk_create([
+        Message(sender=guest if index % 2 else host, recipient=host if index % 2 else guest,
+                message_body=f'Message {index} about the stay')
+        for index in range(rows)
+    ], batch_size=1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000, help='Rows in each list')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        seed(args.rows, random.Random(15))
+        request = Request(APIRequestFactory().get('/'))
+        lists = [
+            (PropertyListSerializer, Property.objects.filter(is_active=True).order_by('-created_at')),
+            (BookingSerializer, Booking.objects.order_by('-created_at')),
+            (MessageSerializer, Message.objects.all()),
+        ]
+        print(f'{"serializer":<24}{"rows":>6}{"DRF rows/s":>14}{"values rows/s":>16}{"render":>9}{"end to end":>12}')
+        for serializer_class, queryset in lists:
+            names, expanded = serializer_class.rendered_fields(request)
+            prepared = serializer_class.prepare_queryset(queryset, set(names), expanded)
+            representation = ValuesRepresentation.compile(serializer_class(context={'request': request}), prepared)
+            assert representation is not None, f'{serializer_class.__name__} has no values() path'
+
+            def serialize(objects):
+                return serializer_class(objects, many=True, context={'request': request}).data
+
+            objects = list(prepared.all())
+            rows = list(representation.values())
+            assert representation.render(rows) == [dict(item) for item in serialize(objects)], \
+                f'{serializer_class.__name__} output differs'
+
+            drf_render, _ = timed(lambda: serialize(objects), args.repeat)
+            fast_render, _ = timed(lambda: representation.render(rows), args.repeat)
+            drf_total, _ = timed(lambda: serialize(list(prepared.all())), args.repeat)
+            fast_total, _ = timed(lambda: representation.render(list(representation.values())), args.repeat)
+            print(f'{serializer_class.__name__:<24}{len(rows):>6}{len(rows) / drf_render:>14,.0f}'
+                  f'{len(rows) / fast_render:>16,.0f}{drf_render / fast_render:>8.1f}x{drf_total / fast_total:>11.1f}x')
+        print('\nrows/s and "render" compare rendering only; "end to end" includes the query.')
+
+
+if __name__ == '__main__':
+    main()